@@ -0,0 +1,57 @@
+"""
+    Time the text tables of a book rendered in turn and in a pool
+
+    python benchmarks/books.py [sheets] [columns]
+
+A pool pays off only when a sheet takes longer to format than to be
+sent to a worker and back, so the rows per sheet go up until it does.
+Rendering in turn stays the default.
+"""
+import sys
+import timeit
+
+import pyexcel as pe
+from pyexcel._compact import StringIO
+
+from pyexcel_text.textr import Tabulater
+
+ROWS_PER_SHEET = [100, 1000, 10000]
+POOLS = [('2 processes', 2, False), ('4 processes', 4, False),
+         ('4 threads', 4, True)]
+
+
+def make_book(sheets, rows, columns):
+    cells = [1, 2.5, 'text', None, '3', True]
+    return pe.Book(dict(
+        ('sheet %d' % index,
+         [[cells[(row + column) % len(cells)]
+           for column in range(columns)]
+          for row in range(rows)])
+        for index in range(sheets)))
+
+
+def render(book, **keywords):
+    renderer = Tabulater('grid')
+    renderer.set_write_title(True)
+    renderer.set_output_stream(StringIO())
+    renderer.render_book(book, **keywords)
+
+
+def main(sheets=8, columns=10, repeat=3):
+    print("%-10s %10s" % ('rows/sheet', 'in turn') +
+          ''.join(" %20s" % name for name, _, _ in POOLS))
+    for rows in ROWS_PER_SHEET:
+        book = make_book(sheets, rows, columns)
+        serial = min(timeit.repeat(lambda: render(book), number=1,
+                                   repeat=repeat))
+        line = "%-10d %9.3fs" % (rows, serial)
+        for _, workers, threads in POOLS:
+            seconds = min(timeit.repeat(
+                lambda: render(book, workers=workers, threads=threads),
+                number=1, repeat=repeat))
+            line += " %9.3fs (%5.2fx)" % (seconds, serial / seconds)
+        print(line)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,54 @@
+"""
+    Write a sheet full of dates as json, with the serializer of 0.2.7
+    and with pyexcel_text.jsonr.Serializer
+
+    python benchmarks/dates.py [rows] [columns]
+"""
+import sys
+import datetime
+import timeit
+
+from pyexcel_text.jsonbackend import get_backend
+from pyexcel_text.jsonr import Serializer
+
+
+def old_serializer(obj):
+    if isinstance(obj, datetime.datetime):
+        return obj.strftime('%Y-%m-%d %H:%M:%S.%f')
+    elif isinstance(obj, datetime.date):
+        return obj.strftime('%Y-%m-%d')
+    return str(obj)
+
+
+def make_rows(rows, columns):
+    start = datetime.datetime(2017, 1, 2, 3, 4, 5, 6)
+    return [[start + datetime.timedelta(minutes=row * columns + index)
+             if index % 2 else
+             (start + datetime.timedelta(days=row + index)).date()
+             for index in range(columns)]
+            for row in range(rows)]
+
+
+def run(rows, backend, default):
+    for row in rows:
+        backend.dumps(row, default=default)
+
+
+def main(rows=20000, columns=10, repeat=3):
+    content = make_rows(rows, columns)
+    for backend_name in ['json', 'orjson']:
+        try:
+            backend = get_backend(backend_name)
+        except ImportError:
+            continue
+        for name, default in [('0.2.7', old_serializer),
+                              ('dispatch', Serializer())]:
+            seconds = min(timeit.repeat(
+                lambda: run(content, backend, default),
+                number=1, repeat=repeat))
+            print("%-7s %-9s %8.3fs %12.0f cells/s" % (
+                backend_name, name, seconds, rows * columns / seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,46 @@
+"""
+    Decode ndjson line by line and in batches
+
+    python benchmarks/ndjson.py [rows] [columns]
+"""
+import sys
+import timeit
+
+from pyexcel._compact import StringIO
+
+from pyexcel_text.ndjsonp import NDJsonParser, ARRAY
+
+
+def make_content(rows, columns):
+    return ''.join(
+        '[%s]\n' % ', '.join(str(row * columns + index)
+                             for index in range(columns))
+        for row in range(rows))
+
+
+def run(content, json_backend, batch_size):
+    parser = NDJsonParser('ndjson')
+    sheets = parser.parse_file_stream(StringIO(content), struct=ARRAY,
+                                      json_backend=json_backend,
+                                      batch_size=batch_size)
+    for sheet in sheets.values():
+        for _ in sheet:
+            pass
+
+
+def main(rows=100000, columns=5, repeat=3):
+    content = make_content(rows, columns)
+    for json_backend in ['json', 'orjson', 'ujson', 'rapidjson']:
+        for batch_size in [1, 1000]:
+            try:
+                seconds = min(timeit.repeat(
+                    lambda: run(content, json_backend, batch_size),
+                    number=1, repeat=repeat))
+            except ImportError:
+                break
+            print("%-10s batch %-5d %8.3fs %12.0f rows/s" % (
+                json_backend, batch_size, seconds, rows / seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
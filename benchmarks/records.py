@@ -0,0 +1,37 @@
+"""
+    Compare pyexcel's records reader with pyexcel_text.records
+
+    python benchmarks/records.py [rows] [columns]
+"""
+import sys
+import timeit
+
+from pyexcel.plugins.sources.pydata.common import (
+    RecordsReader as BaseRecordsReader)
+
+from pyexcel_text.records import RecordsReader
+
+
+def make_records(rows, columns):
+    keys = ['column_%d' % index for index in range(columns)]
+    return [dict((key, row * columns + index)
+                 for index, key in enumerate(keys))
+            for row in range(rows)]
+
+
+def run(reader_class, content):
+    for _ in reader_class(content).to_array():
+        pass
+
+
+def main(rows=10000, columns=100, repeat=3):
+    content = make_records(rows, columns)
+    for name, reader_class in [('pyexcel', BaseRecordsReader),
+                               ('pyexcel_text', RecordsReader)]:
+        seconds = min(timeit.repeat(lambda: run(reader_class, content),
+                                    number=1, repeat=repeat))
+        print("%-14s %8.3fs %12.0f rows/s" % (name, seconds, rows / seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
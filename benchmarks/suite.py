@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+    Time every parser and renderer of pyexcel_text and measure the
+    memory they take at most
+
+    python benchmarks/suite.py [--rows 10000] [--columns 10] [--sheets 5]
+                               [--types mixed] [--only json]
+                               [--save baseline.json]
+                               [--compare baseline.json] [--threshold 0.25]
+
+--types is one of mixed, numbers, text or dates. --only picks the cases
+whose names contain it. With --compare, the cases that take more time or
+memory than in the saved run, by more than the threshold, are listed and
+the exit status is 1. Compare runs of the same settings on one machine.
+"""
+import sys
+import json
+import timeit
+import argparse
+import datetime
+import tracemalloc
+
+import pyexcel as pe
+from pyexcel._compact import StringIO
+
+from pyexcel_text.jsonp import JsonParser
+from pyexcel_text.ndjsonp import NDJsonParser, ARRAY, RECORDS, DICT
+from pyexcel_text.jsonr import Jsonifier
+from pyexcel_text.ndjsonr import NDJsonifier
+from pyexcel_text.textr import Tabulater
+
+TEXT_FORMATS = ['html', 'simple', 'plain', 'grid', 'pipe', 'orgtbl', 'rst',
+                'mediawiki', 'latex', 'latex_booktabs']
+START = datetime.datetime(2017, 1, 2, 3, 4, 5)
+CELLS = {
+    'numbers': [lambda n: n, lambda n: n * 0.25],
+    'text': [lambda n: 'text %d' % n, lambda n: u'été %d' % n],
+    'dates': [lambda n: (START + datetime.timedelta(days=n)).date(),
+              lambda n: START + datetime.timedelta(minutes=n)],
+    'mixed': [lambda n: n, lambda n: n * 0.25, lambda n: 'text %d' % n,
+              lambda n: None if n % 3 else True,
+              lambda n: (START + datetime.timedelta(days=n)).date()]
+}
+
+
+def make_rows(rows, columns, types='mixed'):
+    cells = CELLS[types]
+    return [[cells[column % len(cells)](row * columns + column)
+             for column in range(columns)]
+            for row in range(rows)]
+
+
+def make_sheet(rows, columns, types='mixed', name='sheet'):
+    headers = ['column %d' % column for column in range(columns)]
+    return pe.Sheet([headers] + make_rows(rows, columns, types), name=name,
+                    name_columns_by_row=0)
+
+
+def make_book(sheets, rows, columns, types='mixed'):
+    return pe.Book(dict(
+        ('sheet %d' % index,
+         [['column %d' % column for column in range(columns)]] +
+         make_rows(rows, columns, types))
+        for index in range(sheets)))
+
+
+def render(renderer_class, file_type, content, book=False, **keywords):
+    renderer = renderer_class(file_type)
+    renderer.set_write_title(True)
+    renderer.set_output_stream(StringIO())
+    if book:
+        renderer.render_book(content, **keywords)
+    else:
+        renderer.render_sheet(content, **keywords)
+
+
+def parse(parser, text, **keywords):
+    sheets = parser.parse_file_stream(StringIO(text), **keywords)
+    for rows in sheets.values():
+        for _ in rows:
+            pass
+
+
+def make_cases(options):
+    """
+    Return (name, function, rows handled) of every case
+    """
+    sheet = make_sheet(options.rows, options.columns, options.types)
+    plain = pe.Sheet(make_rows(options.rows, options.columns,
+                               options.types))
+    book = make_book(options.sheets, options.rows // options.sheets or 1,
+                     options.columns, options.types)
+    rows = options.rows
+    book_rows = (options.rows // options.sheets or 1) * options.sheets
+
+    array_json = plain.get_json(write_title=False)
+    records_json = sheet.get_json(write_title=False)
+    book_json = book.get_json()
+    array_ndjson = plain.get_ndjson()
+    records_ndjson = sheet.get_ndjson()
+    dict_ndjson = ''.join(
+        '{"row %d": %s}\n' % (index, json.dumps(row[1:]))
+        for index, row in enumerate(json.loads(array_json)))
+
+    json_parser = JsonParser('json')
+    ndjson_parser = NDJsonParser('ndjson')
+    cases = [
+        ('parse json array',
+         lambda: parse(json_parser, array_json), rows),
+        ('parse json records',
+         lambda: parse(json_parser, records_json), rows),
+        ('parse json book',
+         lambda: parse(json_parser, book_json), book_rows),
+        ('parse ndjson array',
+         lambda: parse(ndjson_parser, array_ndjson, struct=ARRAY), rows),
+        ('parse ndjson records',
+         lambda: parse(ndjson_parser, records_ndjson, struct=RECORDS), rows),
+        ('parse ndjson dict',
+         lambda: parse(ndjson_parser, dict_ndjson, struct=DICT), rows),
+        ('render json sheet',
+         lambda: render(Jsonifier, 'json', sheet), rows),
+        ('render json book',
+         lambda: render(Jsonifier, 'json', book, book=True), book_rows),
+        ('render ndjson sheet',
+         lambda: render(NDJsonifier, 'ndjson', sheet), rows)
+    ]
+    for file_type in TEXT_FORMATS:
+        cases.append(('render %s sheet' % file_type,
+                      _bind(render, Tabulater, file_type, sheet), rows))
+    return [case for case in cases if options.only in case[0]]
+
+
+def measure(function, repeat):
+    seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the lines that tell of a regression
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for key, unit in [('seconds', 's'), ('peak_kib', 'KiB')]:
+            if before[key] and result[key] > before[key] * (1 + threshold):
+                regressions.append(
+                    "%-28s %s %.3f%s -> %.3f%s" % (
+                        name, key, before[key], unit, result[key], unit))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--sheets', type=int, default=5)
+    parser.add_argument('--types', choices=sorted(CELLS), default='mixed')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='')
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    options = parser.parse_args(argv)
+
+    results = {}
+    for name, function, rows in make_cases(options):
+        seconds, peak = measure(function, options.repeat)
+        results[name] = {'seconds': seconds, 'peak_kib': peak / 1024.0}
+        print("%-28s %8.3fs %12.0f rows/s %10.0f KiB" % (
+            name, seconds, rows / seconds, peak / 1024.0))
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump({'settings': vars(options), 'results': results}, f,
+                      indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        for key in ['rows', 'columns', 'sheets', 'types']:
+            if baseline['settings'][key] != getattr(options, key):
+                print("\nThe saved run had --%s %s" % (
+                    key, baseline['settings'][key]))
+        regressions = compare(results, baseline['results'],
+                              options.threshold)
+        if regressions:
+            print("\nSlower or bigger by more than %d%%:" % (
+                options.threshold * 100))
+            for line in regressions:
+                print(line)
+            return 1
+    return 0
+
+
+def _bind(function, *arguments):
+    return lambda: function(*arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+    Compare tabulate with pyexcel_text.tables on the common formats
+
+    python benchmarks/tables.py [rows] [columns]
+"""
+import sys
+import timeit
+
+import tabulate
+
+from pyexcel_text.tables import TableWriter
+
+FORMATS = ['simple', 'plain', 'pipe', 'rst']
+
+
+def make_rows(rows, columns):
+    cells = [1, 2.5, 'text', None, '3', True]
+    return [[cells[(row + column) % len(cells)]
+             for column in range(columns)]
+            for row in range(rows)]
+
+
+def main(rows=10000, columns=10, repeat=3):
+    table = make_rows(rows, columns)
+    for tablefmt in FORMATS:
+        writer = TableWriter(tablefmt)
+        before = min(timeit.repeat(
+            lambda: tabulate.tabulate(table, tablefmt=tablefmt),
+            number=1, repeat=repeat))
+        after = min(timeit.repeat(
+            lambda: writer.render(table), number=1, repeat=repeat))
+        print("%-8s tabulate %7.3fs  pyexcel_text %7.3fs  %5.1fx" % (
+            tablefmt, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
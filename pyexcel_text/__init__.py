@@ -29,14 +29,42 @@ PyexcelPluginChain(__name__).add_a_renderer(
     relative_plugin_class_path='jsonr.Jsonifier',
     file_types=['json'],
     stream_type='string'
+).add_a_renderer(
+    relative_plugin_class_path='jsonr.Jsonifier',
+    file_types=['json.gz', 'json.bz2', 'json.xz', 'json.zst'],
+    stream_type='binary'
+).add_a_renderer(
+    relative_plugin_class_path='ndjsonr.NDJsonifier',
+    file_types=['ndjson'],
+    stream_type='string'
+).add_a_renderer(
+    relative_plugin_class_path='ndjsonr.NDJsonifier',
+    file_types=['ndjson.gz', 'ndjson.bz2', 'ndjson.xz', 'ndjson.zst'],
+    stream_type='binary'
 ).add_a_parser(
     relative_plugin_class_path='jsonp.JsonParser',
     file_types=[
-        'json'
+        'json',
+        'json.gz',
+        'json.bz2',
+        'json.xz',
+        'json.zst'
     ]
 ).add_a_parser(
     relative_plugin_class_path='ndjsonp.NDJsonParser',
     file_types=[
-        'ndjson'
+        'ndjson',
+        'ndjson.gz',
+        'ndjson.bz2',
+        'ndjson.xz',
+        'ndjson.zst'
+    ]
+).add_a_parser(
+    relative_plugin_class_path='compressedp.CompressedParser',
+    file_types=[
+        'gz',
+        'bz2',
+        'xz',
+        'zst'
     ]
 )
@@ -0,0 +1,270 @@
+"""
+    pyexcel_text.aio
+    ~~~~~~~~~~~~~~~~~~
+
+    Parse and render json and ndjson in asyncio, python 3.6 and above
+
+    The input can be an asyncio.StreamReader, an aiofiles file or any
+    object with a coroutine read(size). The output can be an
+    asyncio.StreamWriter or any object whose write returns a coroutine.
+    Work is done in batches and the event loop gets a turn after each.
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import asyncio
+import codecs
+import itertools
+from functools import partial
+
+from pyexcel.plugins.sources.pydata.common import ArrayReader
+
+from pyexcel_text.jsonbackend import get_backend
+from pyexcel_text.jsonstream import JsonStream, CHUNK_SIZE
+from pyexcel_text.jsonp import as_a_dict_of_2_dimensional_array
+from pyexcel_text.ndjsonp import (
+    AUTO_DETECT, RECORDS, READERS, DECODE_ERROR, detect_format)
+from pyexcel_text.records import RecordsReader, get_keys
+from pyexcel_text.iterrender import iter_render, iter_render_book
+
+BATCH_SIZE = 1000
+WRITE_SIZE = 65536
+
+
+async def aparse_ndjson(stream, struct=AUTO_DETECT, json_backend=None,
+                        batch_size=BATCH_SIZE):
+    """
+    Yield the rows of ndjson, as NDJsonParser would give them
+
+    batch_size lines are decoded at a time.
+    """
+    loads_lines = get_backend(json_backend).loads_lines
+    rows = _RowMaker(struct)
+    batch = []
+    async for line in _aiter_lines(stream):
+        batch.append(line)
+        if len(batch) == batch_size:
+            for row in rows.convert(_decode_lines(batch, loads_lines)):
+                yield row
+            batch = []
+            await asyncio.sleep(0)
+    if batch:
+        for row in rows.convert(_decode_lines(batch, loads_lines)):
+            yield row
+
+
+async def aparse_json(stream, sheet_name=None, json_backend=None,
+                      batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Yield the rows of json, as JsonParser would give them
+
+    The items of a top level array are decoded as the bytes arrive. Any
+    other document is read in full and decoded in the default executor.
+    A json book gives the rows of sheet_name, or else its first sheet.
+    """
+    loads = get_backend(json_backend).loads
+    source = _FeedStream()
+    json_stream = JsonStream(source, chunk_size=chunk_size, loads=loads)
+    read = partial(_read_into, stream, source, chunk_size)
+    first = await _retry(json_stream.peek, read)
+    if first != '[':
+        while not source.eof:
+            await read()
+        content = await asyncio.get_event_loop().run_in_executor(
+            None, json_stream.read_all)
+        if not isinstance(content, dict):
+            raise ValueError("Unknow file format")
+        book = as_a_dict_of_2_dimensional_array(content)
+        if sheet_name is None:
+            sheet_name = list(book.keys())[0]
+        for row in book[sheet_name]:
+            yield row
+        return
+    rows = _RowMaker(AUTO_DETECT)
+    await _retry(json_stream.start_array, read)
+    batch = []
+    token = await _retry(json_stream.peek, read)
+    if token == ']':
+        return
+    while True:
+        batch.append(await _retry(json_stream.decode_value, read))
+        token = await _retry(json_stream.next_separator, read)
+        if len(batch) == batch_size or token == ']':
+            for row in rows.convert(batch):
+                yield row
+            batch = []
+            await asyncio.sleep(0)
+        if token == ']':
+            break
+
+
+async def arender(stream, sheet, file_type, write_title=True,
+                  encoding=None, **keywords):
+    """
+    Render the sheet into the stream, see iter_render
+
+    :param encoding: e.g. utf-8 if the stream takes bytes
+    """
+    chunks = iter_render(sheet, file_type, write_title=write_title,
+                         **keywords)
+    await _write_chunks(stream, chunks, encoding)
+
+
+async def arender_book(stream, book, file_type, write_title=True,
+                       encoding=None, **keywords):
+    """
+    Render the book into the stream, see iter_render_book
+    """
+    chunks = iter_render_book(book, file_type, write_title=write_title,
+                              **keywords)
+    await _write_chunks(stream, chunks, encoding)
+
+
+class NeedMoreData(Exception):
+    """
+    Nothing more can be read until the next chunk arrives
+    """
+    pass
+
+
+class _FeedStream(object):
+    """
+    The stream that JsonStream reads the bytes fed to it from
+
+    When nothing is left, the size asked for is kept in wanted and
+    NeedMoreData is raised.
+    """
+    def __init__(self):
+        self.eof = False
+        self.wanted = 0
+        self.pending = 0
+        self._chunks = []
+
+    def feed(self, chunk):
+        if chunk:
+            self._chunks.append(chunk)
+            self.pending += len(chunk)
+        else:
+            self.eof = True
+
+    def read(self, size):
+        if not self._chunks:
+            if self.eof:
+                return b''
+            self.wanted = size
+            raise NeedMoreData()
+        data = self._chunks[0][:0].join(self._chunks)
+        data, rest = data[:size], data[size:]
+        self._chunks = [rest] if rest else []
+        self.pending = len(rest)
+        return data
+
+
+class _RowMaker(object):
+    """
+    Turn batches of decoded items into rows with the readers of
+    pyexcel, the headers of records being worked out once
+    """
+    def __init__(self, struct):
+        self._struct = struct
+        self._headers = None
+
+    def convert(self, items):
+        items = iter(items)
+        keywords = {}
+        if self._struct == AUTO_DETECT:
+            self._struct, items = detect_format(items)
+            if self._struct == AUTO_DETECT:
+                raise Exception(
+                    "No auto detection is supported in this version")
+        if self._struct == RECORDS:
+            if self._headers is None:
+                first = next(items, None)
+                if first is None:
+                    return []
+                self._headers = get_keys(first)
+                items = itertools.chain([first], items)
+            else:
+                # the headers went out with the first batch
+                keywords['start_row'] = 1
+            reader = RecordsReader(items, custom_headers=self._headers,
+                                   **keywords)
+        else:
+            reader = READERS.get(self._struct, ArrayReader)(items)
+        return reader.to_array()
+
+
+async def _retry(function, read):
+    while True:
+        try:
+            return function()
+        except NeedMoreData:
+            await read()
+
+
+async def _read_into(stream, source, chunk_size):
+    while True:
+        source.feed(await stream.read(chunk_size))
+        if source.eof or source.pending >= source.wanted:
+            break
+
+
+async def _aiter_lines(stream):
+    if hasattr(stream, '__aiter__'):
+        async for line in stream:
+            yield line
+    elif hasattr(stream, 'readline'):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            yield line
+    else:
+        rest = ''
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        while True:
+            chunk = await stream.read(CHUNK_SIZE)
+            eof = not chunk
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk, final=eof)
+            lines = (rest + chunk).split('\n')
+            rest = lines.pop()
+            for line in lines:
+                yield line
+            if eof:
+                if rest:
+                    yield rest
+                break
+
+
+def _decode_lines(lines, loads_lines):
+    try:
+        return loads_lines(lines)
+    except ValueError:
+        raise ValueError(DECODE_ERROR)
+
+
+async def _write_chunks(stream, chunks, encoding):
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_SIZE:
+            await _write(stream, ''.join(pending), encoding)
+            pending = []
+            size = 0
+    if pending:
+        await _write(stream, ''.join(pending), encoding)
+
+
+async def _write(stream, text, encoding):
+    if encoding is not None:
+        text = text.encode(encoding)
+    result = stream.write(text)
+    if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+        await result
+    elif hasattr(stream, 'drain'):
+        await stream.drain()
+    else:
+        await asyncio.sleep(0)
@@ -0,0 +1,57 @@
+"""
+    pyexcel_text.compressedp
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Parse compressed json and ndjson files, e.g. data.ndjson.gz
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import pyexcel.constants as constants
+from pyexcel.parser import AbstractParser
+from pyexcel.internal import PARSER
+from pyexcel.exceptions import FileTypeNotSupported
+
+from pyexcel_text.jsonp import JsonParser
+from pyexcel_text.ndjsonp import NDJsonParser
+
+PARSERS = {
+    'json': JsonParser,
+    'ndjson': NDJsonParser
+}
+
+
+class CompressedParser(AbstractParser):
+    """
+    pyexcel looks up the parser by the last suffix of a file name only,
+    so the suffix in front of it picks the actual parser. Other files,
+    e.g. data.csv.gz, go to the parser of another plugin for the last
+    suffix, if there is one
+    """
+    def parse_file(self, file_name, **keywords):
+        file_type = file_name.lower().split('.')[-2]
+        if file_type in PARSERS:
+            parser = PARSERS[file_type](file_type)
+        else:
+            parser = _other_parser(self._file_type, file_name)
+        return parser.parse_file(file_name, **keywords)
+
+    def parse_file_stream(self, file_stream, **keywords):
+        raise Exception(
+            "Please use file_type json.%s or ndjson.%s for a stream" % (
+                self._file_type, self._file_type))
+
+    def parse_file_content(self, file_content, **keywords):
+        raise Exception(
+            "Please use file_type json.%s or ndjson.%s for content" % (
+                self._file_type, self._file_type))
+
+
+def _other_parser(file_type, file_name):
+    for plugin_info in PARSER.registry.get(file_type, []):
+        parser_class = PARSER.dynamic_load_library(plugin_info)
+        if parser_class is not CompressedParser:
+            return parser_class(file_type)
+    compound_type = '.'.join(file_name.lower().split('.')[-2:])
+    raise FileTypeNotSupported(
+        constants.FILE_TYPE_NOT_SUPPORTED_FMT % (compound_type, 'read'))
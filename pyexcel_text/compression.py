@@ -0,0 +1,228 @@
+"""
+    pyexcel_text.compression
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Read and write gzip, bz2, xz and zstd compressed text
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import io
+import os
+import bz2
+import gzip
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+from pyexcel.renderer import Renderer
+
+GZIP = 'gz'
+BZ2 = 'bz2'
+XZ = 'xz'
+ZSTD = 'zst'
+COMPRESSIONS = [GZIP, BZ2, XZ, ZSTD]
+MAGIC_BYTES = [
+    (b'\x1f\x8b', GZIP),
+    (b'BZh', BZ2),
+    (b'\xfd7zXZ\x00', XZ),
+    (b'\x28\xb5\x2f\xfd', ZSTD)
+]
+ENCODING = 'utf-8'
+
+
+class CompressedRenderer(Renderer):
+    """
+    Compress the output when the file type or the file name ends with
+    one of the compression suffixes, e.g. json.gz
+    """
+    def get_io(self):
+        if detect(self._file_type, check_content=False):
+            return io.BytesIO()
+        return Renderer.get_io(self)
+
+    def render_sheet_to_file(self, file_name, sheet,
+                             write_title=True, **keywords):
+        self.set_write_title(write_title)
+        with open_file(file_name, 'w') as outfile:
+            self.set_output_stream(outfile)
+            self.render_sheet(sheet, **keywords)
+
+    def render_sheet_to_stream(self, file_stream, sheet,
+                               write_title=True, **keywords):
+        self.set_write_title(write_title)
+        self._render_to_stream(file_stream, self.render_sheet,
+                               sheet, **keywords)
+
+    def render_book_to_file(self, file_name, book,
+                            write_title=True, **keywords):
+        self.set_write_title(write_title)
+        with open_file(file_name, 'w') as outfile:
+            self.set_output_stream(outfile)
+            self.render_book(book, **keywords)
+
+    def render_book_to_stream(self, file_stream, book,
+                              write_title=True, **keywords):
+        self.set_write_title(write_title)
+        self._render_to_stream(file_stream, self.render_book,
+                               book, **keywords)
+
+    def _render_to_stream(self, file_stream, render, data, **keywords):
+        compression = detect(self._file_type, check_content=False)
+        if compression is None:
+            self.set_output_stream(file_stream)
+            render(data, **keywords)
+        else:
+            text_stream = wrap_stream(file_stream, compression, 'w')
+            self.set_output_stream(text_stream)
+            render(data, **keywords)
+            text_stream.close()
+            self.set_output_stream(file_stream)
+
+
+def detect(file_name, check_content=True):
+    """
+    Tell the compression from the suffix, or else the first bytes, of
+    the file. None means it is not compressed.
+    """
+    suffix = file_name.lower().split('.')[-1]
+    if suffix in COMPRESSIONS:
+        return suffix
+    if check_content and os.path.exists(file_name):
+        with open(file_name, 'rb') as f:
+            return detect_content(f.read(6))
+    return None
+
+
+def detect_content(file_content):
+    """
+    Tell the compression from the first bytes of the content
+    """
+    if isinstance(file_content, bytes):
+        for magic, compression in MAGIC_BYTES:
+            if file_content.startswith(magic):
+                return compression
+    return None
+
+
+def open_file(file_name, mode='r'):
+    """
+    Open a file as text, decompressing or compressing it on the fly
+    """
+    compression = detect(file_name, check_content=(mode == 'r'))
+    if compression is None:
+        return open(file_name, mode)
+    return wrap_stream(open(file_name, mode + 'b'), compression, mode,
+                       close_file=True)
+
+
+def open_stream(file_stream, file_type=None):
+    """
+    Return a binary stream as a text stream that decompresses it on the
+    fly if the file type ends with a compression suffix or the stream
+    starts with the magic bytes of one. Other streams are returned as
+    they are, so are the lines of a file given as a list.
+    """
+    if not hasattr(file_stream, 'read') or \
+            not isinstance(file_stream.read(0), bytes):
+        return file_stream
+    compression = None
+    if file_type is not None:
+        compression = detect(file_type, check_content=False)
+    if compression is None:
+        compression = detect_content(_peek(file_stream, 6))
+    if compression is None:
+        return file_stream
+    return wrap_stream(file_stream, compression, 'r')
+
+
+def _peek(file_stream, size):
+    """
+    The first bytes of the stream, which are left to be read again
+    """
+    if hasattr(file_stream, 'peek'):
+        return file_stream.peek(size)[:size]
+    try:
+        position = file_stream.tell()
+        head = file_stream.read(size)
+        file_stream.seek(position)
+    except (AttributeError, IOError, ValueError):
+        # a stream that cannot seek is not looked into
+        return None
+    return head
+
+
+def decompress(file_content):
+    """
+    Return the text of the content, which may be compressed
+    """
+    compression = detect_content(file_content)
+    if compression is not None:
+        text_stream = wrap_stream(io.BytesIO(file_content), compression, 'r')
+        file_content = text_stream.read()
+    elif isinstance(file_content, bytes):
+        file_content = file_content.decode(ENCODING)
+    return file_content
+
+
+def wrap_stream(binary_stream, compression, mode='r', close_file=False):
+    """
+    Put a text stream over a compressed binary stream
+
+    The binary stream stays open when the text stream is closed unless
+    close_file is True.
+    """
+    if compression == GZIP:
+        stream = gzip.GzipFile(fileobj=binary_stream, mode=mode + 'b')
+    elif compression == BZ2:
+        stream = bz2.BZ2File(binary_stream, mode=mode)
+    elif compression == XZ:
+        if lzma is None:
+            raise ImportError("xz needs the lzma module")
+        stream = lzma.LZMAFile(binary_stream, mode=mode)
+    elif compression == ZSTD:
+        stream = _zstd_stream(binary_stream, mode)
+    else:
+        raise Exception("Unknown compression %s" % compression)
+    text_stream = io.TextIOWrapper(stream, encoding=ENCODING)
+    if close_file:
+        text_stream = _ClosingTextStream(text_stream, binary_stream)
+    return text_stream
+
+
+def _zstd_stream(binary_stream, mode):
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Please install zstandard to handle zst files")
+    if mode == 'r':
+        return zstandard.ZstdDecompressor().stream_reader(
+            binary_stream, closefd=False)
+    return zstandard.ZstdCompressor().stream_writer(
+        binary_stream, closefd=False)
+
+
+class _ClosingTextStream(object):
+    """
+    Close the underlying file together with the text stream
+    """
+    def __init__(self, text_stream, binary_stream):
+        self._text_stream = text_stream
+        self._binary_stream = binary_stream
+
+    def __getattr__(self, name):
+        return getattr(self._text_stream, name)
+
+    def __iter__(self):
+        return iter(self._text_stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._text_stream.close()
+        self._binary_stream.close()
@@ -0,0 +1,59 @@
+"""
+    pyexcel_text.iterrender
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Render a sheet or a book as an iterator of text chunks
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import tabulate
+
+from pyexcel_text.textr import iter_tabulating
+from pyexcel_text.jsonr import iter_json, iter_json_book
+from pyexcel_text.ndjsonr import iter_ndjson
+
+
+def iter_render(sheet, file_type, write_title=True, **keywords):
+    """
+    Yield the output of the sheet piece by piece
+
+    Nothing is formatted ahead of the piece asked for, so a web response
+    can be streamed and the rest is never formatted if the consumer
+    stops early. Text tables come line by line, json row by row and
+    ndjson line by line. The formats that tabulate lays out come in one
+    piece.
+
+    :param file_type: json, ndjson or one of the text table formats
+    :param keywords: the keywords of the renderer, e.g. sample_rows or
+                     json_backend
+    """
+    if file_type == 'json':
+        return iter_json(sheet, write_title,
+                         json_backend=keywords.get('json_backend'),
+                         date_format=keywords.get('date_format'),
+                         datetime_format=keywords.get('datetime_format'))
+    elif file_type == 'ndjson':
+        return iter_ndjson(sheet, **keywords)
+    elif file_type in tabulate.tabulate_formats:
+        return iter_tabulating(sheet, file_type, write_title, **keywords)
+    raise Exception("%s cannot be rendered lazily" % file_type)
+
+
+def iter_render_book(book, file_type, write_title=True, **keywords):
+    """
+    Yield the output of the book sheet by sheet, see iter_render
+    """
+    if file_type == 'json':
+        for chunk in iter_json_book(
+                book, json_backend=keywords.get('json_backend'),
+                date_format=keywords.get('date_format'),
+                datetime_format=keywords.get('datetime_format')):
+            yield chunk
+        return
+    for index, sheet in enumerate(book):
+        if index > 0 and file_type != 'ndjson':
+            yield '\n'
+        for chunk in iter_render(sheet, file_type, write_title=write_title,
+                                 **keywords):
+            yield chunk
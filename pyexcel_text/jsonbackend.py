@@ -0,0 +1,192 @@
+"""
+    pyexcel_text.jsonbackend
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Choose the library that encodes and decodes json
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import os
+import re
+import json
+
+BACKEND_ENV = 'PYEXCEL_TEXT_JSON_BACKEND'
+AUTO = 'auto'
+STDLIB = 'json'
+ORJSON = 'orjson'
+UJSON = 'ujson'
+RAPIDJSON = 'rapidjson'
+# fastest first
+PREFERENCE = [ORJSON, RAPIDJSON, UJSON, STDLIB]
+TEXT_TYPE = type(u'')
+# 19 digits in a row may be an integer beyond 64 bits
+LONG_DIGITS = re.compile(u'[0-9]{19}')
+LONG_DIGITS_BYTES = re.compile(b'[0-9]{19}')
+
+
+class StdlibBackend(object):
+    """
+    The json module that comes with python
+    """
+    name = STDLIB
+    item_separator = ', '
+    key_separator = ': '
+
+    def loads(self, text):
+        return json.loads(text)
+
+    def dumps(self, value, default=None):
+        return json.dumps(value, sort_keys=True, default=default)
+
+    def loads_lines(self, lines):
+        """
+        Decode a list of json texts, in one call where it is safe
+
+        Each text is wrapped in an array of its own, so that a text that
+        is not one json value cannot pass unnoticed. Otherwise, or if the
+        batch is not json, the texts are decoded one by one, which raises
+        at the bad one.
+        """
+        items = None
+        if lines and isinstance(lines[0], TEXT_TYPE):
+            try:
+                items = json.loads('[[' + '],['.join(lines) + ']]')
+            except (ValueError, TypeError):
+                pass
+        if items is None or len(items) != len(lines) or \
+                any(len(item) != 1 for item in items):
+            return [self.loads(line) for line in lines]
+        return [item[0] for item in items]
+
+
+class FastBackend(StdlibBackend):
+    """
+    Base class of third party backends
+
+    They all write compact json. Whatever they cannot handle, e.g.
+    NaN or integers beyond 64 bits, is passed back to the json module.
+    """
+    item_separator = ','
+    key_separator = ':'
+
+    def loads(self, text):
+        try:
+            return self._loads(text)
+        except ValueError:
+            return json.loads(text)
+
+    def dumps(self, value, default=None):
+        try:
+            return self._dumps(value, default)
+        except (TypeError, ValueError, OverflowError):
+            return json.dumps(value, sort_keys=True, default=default,
+                              separators=(',', ':'))
+
+    def loads_lines(self, lines):
+        # these libraries gain nothing from a batch
+        return [self.loads(line) for line in lines]
+
+    def _loads(self, text):
+        raise NotImplementedError("Please implement _loads")
+
+    def _dumps(self, value, default):
+        raise NotImplementedError("Please implement _dumps")
+
+
+class OrjsonBackend(FastBackend):
+    name = ORJSON
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        # dates go through the default function as they do in json
+        self._options = (orjson.OPT_SORT_KEYS |
+                         orjson.OPT_NON_STR_KEYS |
+                         orjson.OPT_PASSTHROUGH_DATETIME)
+
+    def _loads(self, text):
+        # orjson turns integers beyond 64 bits into floats instead of
+        # rejecting them
+        if isinstance(text, TEXT_TYPE):
+            long_digits = LONG_DIGITS
+        else:
+            long_digits = LONG_DIGITS_BYTES
+        if long_digits.search(text) is not None:
+            raise ValueError("orjson does not keep long integers")
+        return self._orjson.loads(text)
+
+    def _dumps(self, value, default):
+        return self._orjson.dumps(
+            value, default=default, option=self._options).decode('utf-8')
+
+
+class UjsonBackend(FastBackend):
+    name = UJSON
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def _loads(self, text):
+        return self._ujson.loads(text)
+
+    def _dumps(self, value, default):
+        return self._ujson.dumps(value, sort_keys=True, default=default)
+
+
+class RapidjsonBackend(FastBackend):
+    name = RAPIDJSON
+
+    def __init__(self):
+        import rapidjson
+        self._rapidjson = rapidjson
+
+    def _loads(self, text):
+        return self._rapidjson.loads(text)
+
+    def _dumps(self, value, default):
+        return self._rapidjson.dumps(value, sort_keys=True, default=default)
+
+
+BACKENDS = {
+    STDLIB: StdlibBackend,
+    ORJSON: OrjsonBackend,
+    UJSON: UjsonBackend,
+    RAPIDJSON: RapidjsonBackend
+}
+_LOADED = {}
+
+
+def get_backend(name=None, default=STDLIB):
+    """
+    Return the json backend
+
+    :param name: one of json, orjson, ujson, rapidjson or auto. If it is
+                 not given, the environment variable
+                 PYEXCEL_TEXT_JSON_BACKEND is looked up, then default,
+                 the json module. auto picks the fastest library
+                 installed.
+    """
+    if name is None:
+        name = os.environ.get(BACKEND_ENV, default)
+    if name == AUTO:
+        for candidate in PREFERENCE:
+            backend = _load(candidate)
+            if backend is not None:
+                return backend
+    if name not in BACKENDS:
+        raise Exception("Unknown json backend %s" % name)
+    backend = _load(name)
+    if backend is None:
+        raise ImportError("%s is not installed" % name)
+    return backend
+
+
+def _load(name):
+    if name not in _LOADED:
+        try:
+            _LOADED[name] = BACKENDS[name]()
+        except ImportError:
+            _LOADED[name] = None
+    return _LOADED[name]
@@ -7,42 +7,182 @@
     :copyright: (c) 2014-2017 by C. W.
     :license: New BSD
 """
-import json
+import itertools
 import pyexcel.constants as constants
+from pyexcel._compact import OrderedDict, StringIO, BytesIO
 from pyexcel.parser import AbstractParser
 from pyexcel.plugins.sources.pydata.common import (
-    ArrayReader, RecordsReader, DictReader)
+    ArrayReader, DictReader)
 from pyexcel.plugins.sources.pydata.bookdict import BookDictSource
 
+from pyexcel_text import jsonstream, compression
+from pyexcel_text.jsonbackend import get_backend
+from pyexcel_text.records import RecordsReader, project_rows
+from pyexcel_text.schema import apply_schema
+from pyexcel_text.metrics import timer, byte_size
+
 
 class JsonParser(AbstractParser):
-    def parse_file(self, file_name, **keywords):
-        with open(file_name, 'r') as f:
-            content = json.load(f)
-            return as_a_dict_of_2_dimensional_array(content, **keywords)
+    """
+    parse json
 
-    def parse_file_stream(self, file_stream, **keywords):
-        content = json.load(file_stream)
-        return as_a_dict_of_2_dimensional_array(content, **keywords)
+    A top level array is decoded item by item so that rows are
+    handed over one at a time. Compressed files are read on the fly.
 
-    def parse_file_content(self, file_content, **keywords):
-        content = json.loads(file_content)
-        return as_a_dict_of_2_dimensional_array(content, **keywords)
+    Given sheet_name or sheet_index, a book is read as far as that sheet
+    only and the sheets before it are skipped without being decoded.
+    sheet_index counts the sheets in the order of the document.
+    """
+    def parse_file(self, file_name, on_demand=False, **keywords):
+        if on_demand:
+            file_handle = compression.open_file(file_name)
+            content = self.parse_file_stream(file_handle, **keywords)
+            self._free_me_up_later(file_handle)
+            return content
+        else:
+            with compression.open_file(file_name) as f:
+                content = self.parse_file_stream(f, **keywords)
+                for key in content:
+                    content[key] = list(content[key])
+                return content
 
+    def parse_file_stream(self, file_stream, json_backend=None,
+                          sheet_index=None, metrics=None, **keywords):
+        """
+        :param metrics: a pyexcel_text.metrics.Metrics to count bytes
+                        and rows into and time the decoding and the rest
+        """
+        backend = get_backend(json_backend)
+        file_stream = compression.open_stream(file_stream,
+                                              self._file_type)
+        if metrics is not None:
+            file_stream = metrics.watch_input(file_stream)
+        start = _tell(file_stream)
+        json_stream = jsonstream.JsonStream(file_stream,
+                                            loads=backend.loads)
+        if json_stream.peek() == '{' and (
+                sheet_index is not None or 'sheet_name' in keywords):
+            sheets = read_a_sheet_of_book(json_stream,
+                                          sheet_index=sheet_index,
+                                          metrics=metrics, **keywords)
+            if sheets is not None:
+                return sheets
+            elif start is None:
+                raise ValueError(
+                    "Cannot find sheet %s" % keywords['sheet_name'])
+            # the whole book, as it used to be for an unknown name
+            file_stream.seek(start)
+            json_stream = jsonstream.JsonStream(file_stream,
+                                                loads=backend.loads)
+        if metrics is None:
+            content = json_stream.load()
+        elif json_stream.peek() == '[':
+            content = metrics.time_decoding(json_stream.iter_array())
+        else:
+            content = _timed(metrics, json_stream.read_all)
+        return as_a_dict_of_2_dimensional_array(content, metrics=metrics,
+                                                **keywords)
 
-def as_a_dict_of_2_dimensional_array(
-        content, sheet_name=constants.DEFAULT_NAME,
-        **keywords):
-    if isinstance(content, list):
-        if isinstance(content[0], list):
-            array_reader = ArrayReader(content, **keywords)
-            return {sheet_name: array_reader.to_array()}
-        elif isinstance(content[0], dict):
-            records_reader = RecordsReader(content, **keywords)
-            return {sheet_name: records_reader.to_array()}
+    def parse_file_content(self, file_content, json_backend=None,
+                           sheet_index=None, metrics=None, **keywords):
+        file_content = compression.decompress(file_content)
+        if sheet_index is not None or 'sheet_name' in keywords:
+            if isinstance(file_content, bytes):
+                file_stream = BytesIO(file_content)
+            else:
+                file_stream = StringIO(file_content)
+            return self.parse_file_stream(
+                file_stream, json_backend=json_backend,
+                sheet_index=sheet_index, metrics=metrics, **keywords)
+        loads = get_backend(json_backend).loads
+        if metrics is None:
+            content = loads(file_content)
         else:
-            raise ValueError("Unknow file format")
-    elif isinstance(content, dict):
+            metrics.bytes_read += byte_size(file_content)
+            content = _timed(metrics, loads, file_content)
+        return as_a_dict_of_2_dimensional_array(content, metrics=metrics,
+                                                **keywords)
+
+
+def read_a_sheet_of_book(json_stream, sheet_name=None, sheet_index=None,
+                         metrics=None, **keywords):
+    """
+    Decode the wanted sheet of a json book, row by row
+
+    An object that is not a book is decoded in full as before. None
+    is returned if no sheet has the name.
+    """
+    members = json_stream.iter_members()
+    for index, key in enumerate(members):
+        if index == 0 and json_stream.peek_item() != '[':
+            content = _timed(metrics, _decode_members, json_stream, key,
+                             members)
+            if sheet_name is not None:
+                keywords['sheet_name'] = sheet_name
+            return as_a_dict_of_2_dimensional_array(
+                content, metrics=metrics, **keywords)
+        if sheet_index is None:
+            wanted = key == sheet_name
+        else:
+            wanted = index == sheet_index
+        if not wanted:
+            json_stream.skip_value()
+        elif json_stream.peek_item() == ']':
+            return {key: []}
+        else:
+            rows = json_stream.iter_array()
+            if metrics is not None:
+                rows = metrics.time_decoding(rows)
+            return as_a_dict_of_2_dimensional_array(
+                rows, sheet_name=key, metrics=metrics, **keywords)
+    if sheet_index is None:
+        return None
+    raise IndexError("Index %d of out bound" % sheet_index)
+
+
+def _decode_members(json_stream, first_key, members):
+    content = OrderedDict([(first_key, json_stream.decode_value())])
+    for key in members:
+        content[key] = json_stream.decode_value()
+    return content
+
+
+def _timed(metrics, function, *arguments):
+    if metrics is None:
+        return function(*arguments)
+    start = timer()
+    try:
+        return function(*arguments)
+    finally:
+        metrics.decode_seconds += timer() - start
+
+
+def _tell(file_stream):
+    try:
+        return file_stream.tell()
+    except (AttributeError, IOError, ValueError):
+        return None
+
+
+def as_a_dict_of_2_dimensional_array(content, metrics=None, **keywords):
+    """
+    :param columns: the keys of records, or the indices of the rows
+                    otherwise, to keep in this order
+    :param schema: see NDJsonParser.parse_rows. Each sheet of a book
+                   gets a schema of its own unless a Schema is given
+    :param metrics: a Metrics that the rows of each sheet are counted
+                    and timed into
+    """
+    sheets = _as_a_dict(content, **keywords)
+    if metrics is not None:
+        for name in sheets:
+            sheets[name] = metrics.time_parsing(sheets[name])
+    return sheets
+
+
+def _as_a_dict(content, sheet_name=constants.DEFAULT_NAME, columns=None,
+               schema=None, schema_rows=None, **keywords):
+    if isinstance(content, dict):
         try:
             keys = list(content.keys())
             first_item = content.get(keys[0])[0]
@@ -51,7 +191,38 @@ def as_a_dict_of_2_dimensional_array(
             raise
         if isinstance(first_item, list):
             bookdict = BookDictSource(content, **keywords)
-            return bookdict.get_data()
+            sheets = bookdict.get_data()
+            for name in sheets:
+                rows = sheets[name]
+                if columns is not None:
+                    rows = project_rows(rows, columns)
+                sheets[name] = apply_schema(rows, schema=schema,
+                                            schema_rows=schema_rows)
+            return sheets
         else:
             dict_reader = DictReader(content, **keywords)
-            return {sheet_name: dict_reader.to_array()}
+            rows = dict_reader.to_array()
+            if columns is not None:
+                rows = project_rows(rows, columns)
+    else:
+        # content can be a list or a generator of rows
+        rows = iter(content)
+        first_row = next(rows, None)
+        content = itertools.chain([first_row], rows)
+        if isinstance(first_row, list):
+            if columns is not None:
+                content = project_rows(content, columns)
+            array_reader = ArrayReader(content, **keywords)
+            rows = array_reader.to_array()
+        elif isinstance(first_row, dict):
+            if columns is not None:
+                keywords['custom_headers'] = list(columns)
+            records_reader = RecordsReader(content, **keywords)
+            rows = apply_schema(records_reader.to_array(), schema=schema,
+                                schema_rows=schema_rows,
+                                header=not keywords.get('start_row'))
+            return {sheet_name: rows}
+        else:
+            raise ValueError("Unknow file format")
+    return {sheet_name: apply_schema(rows, schema=schema,
+                                     schema_rows=schema_rows)}
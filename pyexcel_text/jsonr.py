@@ -8,52 +8,219 @@
     :license: New BSD
 """
 import json
+import uuid
+import decimal
 import datetime
-from pyexcel.renderer import Renderer
+from pyexcel._compact import StringIO
 
+from pyexcel_text.jsonbackend import get_backend, STDLIB
+from pyexcel_text.compression import CompressedRenderer
+from pyexcel_text.metrics import instrumented
 
-class Jsonifier(Renderer):
 
-    def render_sheet(self, sheet):
-        content = jsonify(sheet, self._file_type, self._write_title)
-        self._stream.write(content)
+class Jsonifier(CompressedRenderer):
+    """
+    render json
 
-    def render_book(self, book):
-        content = jsonify_book(book, self._file_type)
-        self._stream.write(content)
+    date_format and datetime_format, strftime formats, change how dates
+    and datetimes are written, see Serializer.
+    """
+    @instrumented
+    def render_sheet(self, sheet, json_backend=None, date_format=None,
+                     datetime_format=None, **keywords):
+        jsonify_to_stream(self._stream, sheet, self._write_title,
+                          json_backend=json_backend,
+                          date_format=date_format,
+                          datetime_format=datetime_format)
 
+    @instrumented
+    def render_book(self, book, json_backend=None, date_format=None,
+                    datetime_format=None, **keywords):
+        for chunk in iter_json_book(book, json_backend=json_backend,
+                                    date_format=date_format,
+                                    datetime_format=datetime_format):
+            self._stream.write(chunk)
 
-def jsonify(sheet, file_type, write_title):
-    content = ""
-    table = sheet.to_array()
+
+def jsonify(sheet, file_type, write_title, json_backend=None):
+    stream = StringIO()
+    jsonify_to_stream(stream, sheet, write_title, json_backend=json_backend)
+    return stream.getvalue()
+
+
+def jsonify_to_stream(stream, sheet, write_title, json_backend=None,
+                      **keywords):
+    """
+    Write the sheet as json, row by row, into the stream
+
+    The output is the same as json.dumps(..., sort_keys=True) but the
+    whole table is never turned into one string.
+    """
+    for chunk in iter_json(sheet, write_title, json_backend=json_backend,
+                           **keywords):
+        stream.write(chunk)
+
+
+def iter_json(sheet, write_title, json_backend=None, date_format=None,
+              datetime_format=None):
+    """
+    Yield the json of the sheet row by row
+    """
+    backend = get_backend(json_backend, default=STDLIB)
+    default = get_serializer(date_format, datetime_format)
+    if write_title:
+        yield '{%s%s' % (json.dumps(sheet.name), backend.key_separator)
+    table = _get_table(sheet)
+    if isinstance(table, dict):
+        chunks = _object_chunks(table, backend, default)
+    else:
+        chunks = _array_chunks(table, backend, default)
+    for chunk in chunks:
+        yield chunk
+    if write_title:
+        yield '}'
+
+
+def _get_table(sheet):
     if hasattr(sheet, 'rownames'):
         colnames = sheet.colnames
         rownames = sheet.rownames
         # In the following, row[0] is the name of each row
         if colnames and rownames:
-            table = dict((row[0], dict(zip(colnames, row[1:])))
-                         for row in table[1:])
-        elif colnames:
-            table = sheet.to_records()
-        elif rownames:
-            table = sheet.to_records()
-    else:
-        table = list(table)
-    if write_title:
-        content = {sheet.name: table}
-    else:
-        content = table
-    return json.dumps(content, sort_keys=True, default=_serializer)
+            table = sheet.to_array()
+            return dict((row[0], dict(zip(colnames, row[1:])))
+                        for row in table[1:])
+        elif colnames or rownames:
+            return sheet.to_records()
+    return sheet.to_array()
+
+
+def _array_chunks(rows, backend, default):
+    yield '['
+    for index, row in enumerate(rows):
+        if index > 0:
+            yield backend.item_separator
+        yield backend.dumps(row, default=default)
+    yield ']'
+
+
+def _object_chunks(table, backend, default):
+    yield '{'
+    for index, key in enumerate(sorted(table.keys())):
+        if index > 0:
+            yield backend.item_separator
+        # let json convert the key the way json.dumps does
+        yield backend.dumps({key: table[key]}, default=default)[1:-1]
+    yield '}'
+
+
+def jsonify_book(book, file_type, json_backend=None):
+    return ''.join(iter_json_book(book, json_backend=json_backend))
+
+
+def iter_json_book(book, json_backend=None, date_format=None,
+                   datetime_format=None):
+    """
+    Yield the json of the book sheet by sheet, row by row
+
+    The output is the same as dumping book.to_dict() with sorted keys,
+    but only the sheet names are sorted and no copy of the book is made.
+    """
+    backend = get_backend(json_backend, default=STDLIB)
+    default = get_serializer(date_format, datetime_format)
+    sheets = dict((sheet.name, sheet) for sheet in book)
+    yield '{'
+    for index, name in enumerate(sorted(sheets.keys())):
+        if index > 0:
+            yield backend.item_separator
+        yield backend.dumps(name) + backend.key_separator
+        for chunk in _array_chunks(sheets[name].to_array(), backend,
+                                   default):
+            yield chunk
+    yield '}'
+
+
+class Serializer(object):
+    """
+    The default function of json.dumps, for what json cannot write
+
+    The conversion is looked up by the type of the value; the types
+    that are not in the table are matched once and then added to it.
+    By default, datetimes are written as 2017-01-02 03:04:05.000000,
+    dates as 2017-01-02, numpy scalars as numbers and the rest, e.g.
+    times, decimals and uuids, as str gives them.
+
+    :param date_format: the strftime format of dates
+    :param datetime_format: the strftime format of datetimes
+    """
+    def __init__(self, date_format=None, datetime_format=None):
+        self._conversions = {
+            datetime.datetime: _formatter(datetime_format, _datetime_text),
+            datetime.date: _formatter(date_format, _date_text),
+            datetime.time: str,
+            decimal.Decimal: str,
+            uuid.UUID: str
+        }
+
+    def __call__(self, obj):
+        try:
+            conversion = self._conversions[type(obj)]
+        except KeyError:
+            conversion = self._learn(type(obj))
+        return conversion(obj)
+
+    def _learn(self, obj_type):
+        if obj_type.__module__ == 'numpy' and hasattr(obj_type, 'item'):
+            conversion = _numpy_item
+        else:
+            conversion = str
+            # subclasses, e.g. of datetime, take after their base class
+            for base in obj_type.__mro__:
+                if base in self._conversions:
+                    conversion = self._conversions[base]
+                    break
+        self._conversions[obj_type] = conversion
+        return conversion
+
+
+def get_serializer(date_format=None, datetime_format=None):
+    """
+    The serializer of the formats, made once for each pair
+    """
+    key = (date_format, datetime_format)
+    if key not in _SERIALIZERS:
+        _SERIALIZERS[key] = Serializer(date_format, datetime_format)
+    return _SERIALIZERS[key]
+
+
+def _formatter(date_format, fast_path):
+    if date_format is None:
+        return fast_path
+    return lambda value: value.strftime(date_format)
+
+
+def _datetime_text(value):
+    if value.year < 1000:
+        # strftime does not pad the year with zeros
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    return '%04d-%02d-%02d %02d:%02d:%02d.%06d' % (
+        value.year, value.month, value.day, value.hour, value.minute,
+        value.second, value.microsecond)
+
+
+def _date_text(value):
+    if value.year < 1000:
+        return value.strftime('%Y-%m-%d')
+    return value.isoformat()
 
 
-def jsonify_book(book, file_type):
-    return json.dumps(book.to_dict(), sort_keys=True,
-                      default=_serializer)
+def _numpy_item(value):
+    # a python number, or a string for what has no python equivalent
+    item = value.item()
+    if type(item) is type(value):
+        return str(value)
+    return item
 
 
-def _serializer(obj):
-    if isinstance(obj, datetime.datetime):
-        return obj.strftime('%Y-%m-%d %H:%M:%S.%f')
-    elif isinstance(obj, datetime.date):
-        return obj.strftime('%Y-%m-%d')
-    return str(obj)
+_serializer = Serializer()
+_SERIALIZERS = {(None, None): _serializer}
@@ -0,0 +1,236 @@
+"""
+    pyexcel_text.jsonstream
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Decode a json document incrementally from a file stream
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import re
+import json
+import codecs
+
+CHUNK_SIZE = 65536
+WHITESPACE = ' \t\n\r'
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_PLAIN = r'[^"\[\]{}]*(?:%s[^"\[\]{}]*)*' % _STRING
+STRING = re.compile(_STRING, re.DOTALL)
+# anything but brackets, and arrays that hold no brackets
+PLAIN = re.compile(r'%s(?:\[%s\]%s)*' % (_PLAIN, _PLAIN, _PLAIN),
+                   re.DOTALL)
+
+
+class JsonStream(object):
+    """
+    Decode json values one after another without reading the whole
+    document into memory
+    """
+    def __init__(self, file_stream, chunk_size=CHUNK_SIZE, loads=json.loads):
+        self._stream = file_stream
+        self._loads = loads
+        self._chunk_size = chunk_size
+        self._read_size = chunk_size
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        self._bytes_decoder = None
+
+    def iter_array(self):
+        """
+        Yield the items of a json array one by one
+        """
+        self.start_array()
+        if self.peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.next_separator() == ']':
+                break
+
+    def start_array(self):
+        self._expect('[')
+
+    def next_separator(self):
+        """
+        Consume and return the ',' or ']' after an item of an array
+        """
+        token = self.peek()
+        if token not in (',', ']'):
+            raise ValueError(
+                "Expecting ',' or ']' but got %r" % token)
+        self._position += 1
+        return token
+
+    def iter_members(self):
+        """
+        Yield the keys of a json object one by one
+
+        The value of each key has to be decoded or skipped before the
+        next key is asked for.
+        """
+        self._expect('{')
+        if self.peek() == '}':
+            self._position += 1
+            return
+        while True:
+            key = self.decode_value()
+            self._expect(':')
+            yield key
+            token = self.peek()
+            if token not in (',', '}'):
+                raise ValueError(
+                    "Expecting ',' or '}' but got %r" % token)
+            self._position += 1
+            if token == '}':
+                break
+
+    def peek_item(self):
+        """
+        Return the first character inside the array that comes next,
+        without consuming anything
+        """
+        if self.peek() != '[':
+            return ''
+        while True:
+            index = self._position + 1
+            while (index < len(self._buffer) and
+                   self._buffer[index] in WHITESPACE):
+                index += 1
+            if index < len(self._buffer) or self._eof:
+                return self._buffer[index:index + 1]
+            # the array stays at the start of the buffer
+            self._fill(self._chunk_size)
+
+    def skip_value(self):
+        """
+        Go past the next json value without decoding it
+
+        Arrays and objects are scanned for their brackets, so a sheet
+        that is not wanted costs neither memory nor objects.
+        """
+        if self.peek() not in ('[', '{'):
+            self.decode_value()
+            return
+        depth = 0
+        while True:
+            if self._position >= len(self._buffer):
+                if self._eof:
+                    raise ValueError("Unexpected end of json")
+                self._fill(self._chunk_size)
+                continue
+            token = self._buffer[self._position]
+            if token == '"':
+                match = STRING.match(self._buffer, self._position)
+                if match is None:
+                    if self._eof:
+                        raise ValueError("Unterminated string")
+                    self._fill(self._chunk_size)
+                    continue
+                self._position = match.end()
+            elif token in '[{':
+                depth += 1
+                self._position += 1
+            elif token in ']}':
+                depth -= 1
+                self._position += 1
+                if depth == 0:
+                    return
+            self._position = PLAIN.match(
+                self._buffer, self._position).end()
+
+    def decode_value(self):
+        """
+        Decode the next json value
+        """
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(
+                    self._buffer, self._position)
+            except ValueError:
+                if self._eof:
+                    raise
+                # kept across calls, should a read be retried later
+                self._fill(self._read_size)
+                self._read_size *= 2
+                continue
+            if not self._eof and NUMBER_TAIL.match(
+                    self._buffer, end).end() == len(self._buffer):
+                # a number may continue in the next chunk
+                self._fill(self._read_size)
+                continue
+            self._position = end
+            self._read_size = self._chunk_size
+            return value
+
+    def load(self):
+        """
+        A generator of items if the document is an array, otherwise
+        the rest of the document decoded
+        """
+        if self.peek() == '[':
+            return self.iter_array()
+        return self.read_all()
+
+    def read_all(self):
+        """
+        Decode the rest of the stream as one json value
+        """
+        chunks = [self._buffer[self._position:]]
+        while not self._eof:
+            chunks.append(self._read(self._chunk_size))
+        self._buffer = ''
+        self._position = 0
+        return self._loads(''.join(chunks))
+
+    def peek(self):
+        """
+        Return the next non-whitespace character without consuming it
+        """
+        self._skip_whitespace()
+        return self._buffer[self._position:self._position + 1]
+
+    def _expect(self, token):
+        found = self.peek()
+        if found != token:
+            raise ValueError("Expecting %r but got %r" % (token, found))
+        self._position += 1
+
+    def _skip_whitespace(self):
+        while True:
+            while (self._position < len(self._buffer) and
+                   self._buffer[self._position] in WHITESPACE):
+                self._position += 1
+            if self._position < len(self._buffer) or self._eof:
+                break
+            self._fill(self._chunk_size)
+
+    def _fill(self, size):
+        chunk = self._read(size)
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+
+    def _read(self, size):
+        chunk = self._stream.read(size)
+        if not chunk:
+            self._eof = True
+        if isinstance(chunk, bytes):
+            if self._bytes_decoder is None:
+                self._bytes_decoder = codecs.getincrementaldecoder(
+                    'utf-8')()
+            chunk = self._bytes_decoder.decode(chunk, final=self._eof)
+        return chunk
+
+
+def load(file_stream, chunk_size=CHUNK_SIZE, loads=json.loads):
+    """
+    Return a generator of items if the document is an array,
+    otherwise the document decoded by loads
+    """
+    json_stream = JsonStream(file_stream, chunk_size=chunk_size,
+                             loads=loads)
+    return json_stream.load()
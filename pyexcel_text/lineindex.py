@@ -0,0 +1,128 @@
+"""
+    pyexcel_text.lineindex
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Random access to the lines of a memory mapped file
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import os
+import mmap
+import array
+
+try:
+    array.array('Q')
+    OFFSET_TYPE = 'Q'
+except ValueError:
+    OFFSET_TYPE = 'L'
+INDEX_FILE_SUFFIX = '.idx'
+
+
+class LineIndex(object):
+    """
+    Memory map a file and remember where each line starts
+
+    :param index_file: True, or a path, to keep the offsets in a side car
+                       file. The side car is rebuilt when the size or the
+                       modification time of the file changes.
+    """
+    def __init__(self, file_name, index_file=None):
+        self._file_name = file_name
+        self._file = open(file_name, 'rb')
+        self._size = os.path.getsize(file_name)
+        self._map = None
+        if self._size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        if index_file is True:
+            index_file = file_name + INDEX_FILE_SUFFIX
+        self._offsets = None
+        if index_file:
+            self._offsets = self._load_offsets(index_file)
+        if self._offsets is None:
+            self._offsets = self._build_offsets()
+            if index_file:
+                self._save_offsets(index_file)
+
+    def number_of_lines(self):
+        return len(self._offsets)
+
+    def offset(self, index):
+        """
+        Return the byte offset where the line at index starts
+        """
+        return self._offsets[index]
+
+    def length(self, index):
+        """
+        Return the number of bytes of the line at index, its new line
+        included
+        """
+        if index + 1 < len(self._offsets):
+            return self._offsets[index + 1] - self._offsets[index]
+        return self._size - self._offsets[index]
+
+    def line(self, index):
+        """
+        Return the line at index as text, without its new line
+        """
+        start = self._offsets[index]
+        if index + 1 < len(self._offsets):
+            end = self._offsets[index + 1]
+        else:
+            end = self._size
+        return self._map[start:end].decode('utf-8').rstrip('\r\n')
+
+    def lines(self, start=0, stop=None):
+        """
+        Iterate the lines between start and stop without touching the rest
+        """
+        if stop is None or stop > len(self._offsets):
+            stop = len(self._offsets)
+        for index in range(start, stop):
+            yield self.line(index)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _build_offsets(self):
+        offsets = array.array(OFFSET_TYPE)
+        if self._map is None:
+            return offsets
+        offsets.append(0)
+        position = self._map.find(b'\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = self._map.find(b'\n', position + 1)
+        if offsets[-1] == self._size:
+            # the file ends with a new line
+            offsets.pop()
+        return offsets
+
+    def _stamp(self):
+        modified = int(os.path.getmtime(self._file_name) * 1000000)
+        return [self._size, modified]
+
+    def _load_offsets(self, index_file):
+        if not os.path.exists(index_file):
+            return None
+        offsets = array.array(OFFSET_TYPE)
+        with open(index_file, 'rb') as f:
+            try:
+                offsets.fromfile(f, os.path.getsize(index_file) //
+                                 offsets.itemsize)
+            except EOFError:
+                return None
+        if offsets[:2].tolist() != self._stamp():
+            return None
+        return offsets[2:]
+
+    def _save_offsets(self, index_file):
+        offsets = array.array(OFFSET_TYPE, self._stamp())
+        offsets.extend(self._offsets)
+        with open(index_file, 'wb') as f:
+            offsets.tofile(f)
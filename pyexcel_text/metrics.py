@@ -0,0 +1,174 @@
+"""
+    pyexcel_text.metrics
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Count and time what the parsers and the renderers do
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import time
+import functools
+
+timer = getattr(time, 'perf_counter', time.time)
+ENCODING = 'utf-8'
+
+
+class Metrics(object):
+    """
+    The counters that json and ndjson parsers and all renderers add to,
+    when one is given to them as metrics=
+
+    bytes_read and bytes_written count text as utf-8, new lines included,
+    as it is before compression or after decompression.
+    rows_decoded counts the rows handed out by parsers. decode_seconds
+    is the time spent in the json library and conversion_seconds the
+    rest of the time spent in making rows, reading the file included.
+    render_seconds is the time spent in the renderers.
+
+    :param callback: called with the metrics when a sheet has given its
+                     last row, or a renderer is done, e.g. to send them
+                     to a metrics system
+    """
+    def __init__(self, callback=None):
+        self.bytes_read = 0
+        self.rows_decoded = 0
+        self.decode_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.render_seconds = 0.0
+        self.bytes_written = 0
+        self._callback = callback
+
+    @property
+    def conversion_seconds(self):
+        return max(self.parse_seconds - self.decode_seconds, 0.0)
+
+    def as_dict(self):
+        return {
+            'bytes_read': self.bytes_read,
+            'rows_decoded': self.rows_decoded,
+            'decode_seconds': self.decode_seconds,
+            'conversion_seconds': self.conversion_seconds,
+            'render_seconds': self.render_seconds,
+            'bytes_written': self.bytes_written
+        }
+
+    def report(self):
+        if self._callback is not None:
+            self._callback(self)
+
+    def watch_input(self, file_stream):
+        """
+        Return the stream, counting what is read from it
+        """
+        return CountingReader(file_stream, self)
+
+    def count_input(self, lines):
+        """
+        Yield the lines, counting their bytes
+        """
+        for line in lines:
+            self.bytes_read += byte_size(line)
+            yield line
+
+    def time_decoding(self, items):
+        """
+        Yield the items of a generator that decodes them, timing it
+        """
+        items = iter(items)
+        while True:
+            start = timer()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.decode_seconds += timer() - start
+                return
+            self.decode_seconds += timer() - start
+            yield item
+
+    def time_parsing(self, rows):
+        """
+        Yield the rows of a sheet, timing and counting them
+        """
+        rows = iter(rows)
+        while True:
+            start = timer()
+            try:
+                row = next(rows)
+            except StopIteration:
+                self.parse_seconds += timer() - start
+                self.report()
+                return
+            self.parse_seconds += timer() - start
+            self.rows_decoded += 1
+            yield row
+
+
+class CountingReader(object):
+    """
+    A file stream that counts what is read from it
+    """
+    def __init__(self, file_stream, metrics):
+        self._stream = file_stream
+        self._metrics = metrics
+
+    def read(self, *size):
+        chunk = self._stream.read(*size)
+        self._metrics.bytes_read += byte_size(chunk)
+        return chunk
+
+    def readline(self, *size):
+        line = self._stream.readline(*size)
+        self._metrics.bytes_read += byte_size(line)
+        return line
+
+    def __iter__(self):
+        return self._metrics.count_input(self._stream)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class CountingWriter(object):
+    """
+    An output stream that counts what is written to it
+    """
+    def __init__(self, stream, metrics):
+        self._stream = stream
+        self._metrics = metrics
+
+    def write(self, text):
+        self._metrics.bytes_written += byte_size(text)
+        return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def byte_size(data):
+    """
+    The number of bytes of the data, text being encoded in utf-8
+    """
+    if isinstance(data, bytes):
+        return len(data)
+    return len(data.encode(ENCODING))
+
+
+def instrumented(render):
+    """
+    Let a render method of a renderer take metrics=
+    """
+    @functools.wraps(render)
+    def wrapper(self, content, metrics=None, **keywords):
+        if metrics is None:
+            return render(self, content, **keywords)
+        stream = self._stream
+        self._stream = CountingWriter(stream, metrics)
+        start = timer()
+        try:
+            return render(self, content, **keywords)
+        finally:
+            self._stream = stream
+            metrics.render_seconds += timer() - start
+            metrics.report()
+    return wrapper
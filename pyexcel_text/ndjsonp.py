@@ -1,19 +1,28 @@
 """
-    pyexcel_text.ndjsonr
+    pyexcel_text.ndjsonp
     ~~~~~~~~~~~~~~~~~~~~~~
 
-    Render newline delimited json input
+    Parse newline delimited json input
 
     :copyright: (c) 2014-2017 by C. W.
     :license: New BSD
 """
+import os
 import json
 import itertools
 import pyexcel._compact as compact
 import pyexcel.constants as constants
 from pyexcel.parser import AbstractParser
-from pyexcel.plugins.sources.pydata.common import (
-    ArrayReader, RecordsReader)
+from pyexcel.plugins.sources.pydata.common import ArrayReader
+import pyexcel_io.constants as io_constants
+from pyexcel_io.utils import _index_filter
+
+from pyexcel_text.jsonbackend import get_backend
+from pyexcel_text.parallel import parallel_json_loads
+from pyexcel_text.lineindex import LineIndex
+from pyexcel_text.records import RecordsReader, get_keys, project_rows
+from pyexcel_text.schema import apply_schema
+from pyexcel_text import compression
 
 
 AUTO_DETECT = 'AD'
@@ -21,6 +30,13 @@ ARRAY = 'A'
 RECORDS = 'R'
 DICT = 'D'
 
+RAISE = 'raise'
+SKIP = 'skip'
+COLLECT = 'collect'
+BATCH_SIZE = 1000
+DECODE_ERROR = ("There has been an json decode error."
+                "Pass on_error='skip' to carry on")
+
 
 # pylint: disable=W0223
 class FlatDictReader(ArrayReader):
@@ -42,18 +58,97 @@ READERS = {
 }
 
 
+class ErrorReport(object):
+    """
+    Counts the lines read and the lines that are not json
+
+    With on_error='collect', errors keeps (line number, byte offset,
+    message) of each bad line. Line numbers start from 1 and byte offsets
+    assume utf-8.
+    """
+    def __init__(self, on_error=COLLECT):
+        self.on_error = on_error
+        self.lines_read = 0
+        self.bad_lines = 0
+        self.errors = []
+        self._line_number = 0
+        self._byte_offset = 0
+
+    def watch(self, raw_lines):
+        """
+        Keep track of the position of each raw line going through
+        """
+        byte_offset = 0
+        for line_number, raw_line in enumerate(raw_lines, 1):
+            self.track(line_number, byte_offset)
+            if isinstance(raw_line, bytes):
+                byte_offset += len(raw_line)
+            else:
+                byte_offset += len(raw_line.encode('utf-8'))
+            yield raw_line
+
+    def track(self, line_number, byte_offset):
+        """
+        Tell where the line being decoded is
+        """
+        self.lines_read += 1
+        self._line_number = line_number
+        self._byte_offset = byte_offset
+
+    def add(self, error):
+        self.bad_lines += 1
+        if self.on_error == COLLECT:
+            self.errors.append(
+                (self._line_number, self._byte_offset, str(error)))
+
+
 class NDJsonParser(AbstractParser):
     """
     parse ndjson
+
+    By default, the first line that is not json stops the parsing. Pass
+    on_error='skip' or 'collect' to carry on. The counters end up in
+    error_report, which can be given as a keyword or read back from
+    the parser afterwards.
     """
-    def parse_file(self, file_name, on_demand=False, **keywords):
-        if on_demand:
-            file_handle = open(file_name, 'r')
+    def __init__(self, file_type):
+        AbstractParser.__init__(self, file_type)
+        self.error_report = None
+
+    def parse_file(self, file_name, on_demand=False, workers=1,
+                   ordered=True, memory_map=False, index_file=None,
+                   **keywords):
+        if (workers > 1 or memory_map or index_file) and \
+                compression.detect(file_name):
+            raise Exception(
+                "workers and memory_map need an uncompressed file")
+        if workers > 1:
+            if keywords.get('on_error', RAISE) != RAISE:
+                raise Exception(
+                    "on_error is not supported with workers")
+            content = self.parse_file_in_parallel(
+                file_name, workers, ordered=ordered, **keywords)
+            if not on_demand:
+                for key in content:
+                    content[key] = list(content[key])
+            return content
+        elif memory_map or index_file:
+            line_index = LineIndex(file_name, index_file=index_file)
+            content = self.parse_line_index(line_index, **keywords)
+            if on_demand:
+                self._free_me_up_later(line_index)
+            else:
+                for key in content:
+                    content[key] = list(content[key])
+                line_index.close()
+            return content
+        elif on_demand:
+            file_handle = compression.open_file(file_name)
             content = self.parse_file_stream(file_handle, **keywords)
             self._free_me_up_later(file_handle)
             return content
         else:
-            with open(file_name, 'r') as f:
+            with compression.open_file(file_name) as f:
                 content = self.parse_file_stream(f, **keywords)
                 for key in content:
                     content[key] = list(content[key])
@@ -61,35 +156,289 @@ class NDJsonParser(AbstractParser):
 
     def parse_file_stream(self, file_stream, struct=AUTO_DETECT,
                           sheet_name=constants.DEFAULT_NAME,
-                          **keywords):
-        content = json_loads(file_stream)
+                          json_backend=None, start_row=0, row_limit=-1,
+                          skip_row_func=None, on_error=RAISE,
+                          error_report=None, batch_size=BATCH_SIZE,
+                          metrics=None, **keywords):
+        """
+        Rows left out by start_row, row_limit or skip_row_func are not
+        decoded and reading stops after the last wanted row. Lines of
+        a flat dict, or of a file read with on_error, are all decoded
+        and their rows picked afterwards.
+
+        :param batch_size: the number of lines decoded in one call,
+                           1 to decode them one by one
+        :param metrics: a pyexcel_text.metrics.Metrics to count bytes
+                        and rows into and time the decoding and the rest
+        """
+        backend = get_backend(json_backend)
+        loads = backend.loads
+        report = self._get_error_report(on_error, error_report)
+        file_stream = compression.open_stream(file_stream,
+                                              self._file_type)
+        if metrics is not None:
+            file_stream = metrics.watch_input(file_stream)
+        raw_lines = iter(file_stream)
+        if struct in (AUTO_DETECT, RECORDS):
+            peeked, first_line = _first_json_line(raw_lines, loads, report)
+            raw_lines = itertools.chain(peeked, raw_lines)
+            if struct == AUTO_DETECT:
+                struct, _ = detect_format(iter([first_line]))
+            if struct == RECORDS:
+                # row 0 is made of the keys of the first record
+                keywords.setdefault('custom_headers',
+                                    get_keys(first_line))
+        if report is not None:
+            raw_lines = report.watch(raw_lines)
+        if struct in (ARRAY, RECORDS) and report is None:
+            # one line is one row
+            row_offset = 0
+            reader_start_row = 0
+            if struct == RECORDS:
+                row_offset = 1
+                header = (skip_row_func or _index_filter)(
+                    0, start_row, row_limit)
+                if header == io_constants.STOP_ITERATION:
+                    raw_lines = iter([])
+                elif header == io_constants.SKIP_DATA:
+                    reader_start_row = 1
+                else:
+                    keywords['keep_keys'] = True
+            raw_lines = skip_lines(raw_lines, start_row=start_row,
+                                   row_limit=row_limit,
+                                   skip_row_func=skip_row_func,
+                                   row_offset=row_offset)
+            keywords['start_row'] = reader_start_row
+        else:
+            # a flat dict line makes a row per key and a bad line makes
+            # none, so rows are picked once the lines are decoded
+            keywords.update(start_row=start_row, row_limit=row_limit,
+                            skip_row_func=skip_row_func)
+        content = json_loads(raw_lines, loads, report=report,
+                             loads_lines=backend.loads_lines,
+                             batch_size=batch_size)
+        if metrics is not None:
+            content = metrics.time_decoding(content)
+        return self.parse_rows(content, struct=struct,
+                               sheet_name=sheet_name, metrics=metrics,
+                               **keywords)
+
+    def parse_file_in_parallel(self, file_name, workers, ordered=True,
+                               json_backend=None, metrics=None,
+                               **keywords):
+        """
+        Decode byte ranges of the file in a process pool
+
+        :param workers: the number of processes
+        :param ordered: set it to False if the order of rows does not
+                        matter
+        :param metrics: the time spent waiting for the workers counts as
+                        decode time
+        """
+        content = parallel_json_loads(file_name, workers, ordered=ordered,
+                                      json_backend=json_backend)
+        if metrics is not None:
+            metrics.bytes_read += os.path.getsize(file_name)
+            content = metrics.time_decoding(content)
+        return self.parse_rows(content, metrics=metrics, **keywords)
+
+    def parse_line_index(self, line_index, struct=AUTO_DETECT,
+                         start_row=0, row_limit=-1, json_backend=None,
+                         on_error=RAISE, error_report=None,
+                         batch_size=BATCH_SIZE, metrics=None, **keywords):
+        """
+        Decode only the lines that start_row and row_limit ask for,
+        unless lines and rows do not match, as in parse_file_stream
+        """
+        backend = get_backend(json_backend)
+        loads = backend.loads
+        report = self._get_error_report(on_error, error_report)
+        if line_index.number_of_lines() == 0:
+            raise ValueError("Empty file")
+        _, first_line = _first_json_line(line_index.lines(), loads, report)
+        if struct == AUTO_DETECT:
+            struct, _ = detect_format(iter([first_line]))
+        if struct == RECORDS:
+            # row 0 is made of the keys of the first record
+            keywords.setdefault('custom_headers', get_keys(first_line))
+        if 'skip_row_func' in keywords or struct == DICT or \
+                report is not None:
+            # rows are chosen by the function, a flat dict line makes a
+            # row per key and a bad line makes none: every line is needed
+            start_line, stop_line = 0, None
+        elif struct == RECORDS:
+            start_line = max(start_row - 1, 0)
+            if row_limit > 0:
+                stop_line = start_row + row_limit - 1
+            else:
+                stop_line = None
+            keywords['keep_keys'] = start_row == 0
+            start_row = min(start_row, 1)
+        else:
+            start_line = start_row
+            if row_limit > 0:
+                stop_line = start_row + row_limit
+            else:
+                stop_line = None
+            start_row = 0
+        lines = line_index.lines(start_line, stop_line)
+        if report is not None:
+            lines = _watch_line_index(report, line_index, lines, start_line)
+        if metrics is not None:
+            lines = _count_line_index(metrics, line_index, lines, start_line)
+        content = json_loads(lines, loads, report=report,
+                             loads_lines=backend.loads_lines,
+                             batch_size=batch_size)
+        if metrics is not None:
+            content = metrics.time_decoding(content)
+        return self.parse_rows(content, struct=struct, start_row=start_row,
+                               row_limit=row_limit, metrics=metrics,
+                               **keywords)
+
+    def parse_rows(self, content, struct=AUTO_DETECT,
+                   sheet_name=constants.DEFAULT_NAME, columns=None,
+                   schema=None, schema_rows=None, metrics=None,
+                   keep_keys=False, **keywords):
+        """
+        Turn a generator of decoded lines into a sheet
+
+        :param columns: the keys of records, or the indices of arrays and
+                        of rows otherwise, to keep in this order
+        :param keep_keys: True if the keys of records are wanted even when
+                          no record is left, e.g. with row_limit=1
+        :param schema: 'infer' to find out the type of each column from
+                       the first schema_rows rows, or the types as a list
+                       or a dict, see pyexcel_text.schema.Schema
+        """
         if struct == AUTO_DETECT:
             struct, content = detect_format(content)
             if struct == AUTO_DETECT:
                 raise Exception(
                     "No auto detection is supported in this version")
 
+        if columns is not None:
+            if struct == RECORDS:
+                keywords['custom_headers'] = list(columns)
+            elif struct == ARRAY:
+                content = project_rows(content, columns)
         if struct in READERS:
             reader = READERS[struct](content, **keywords)
         else:
             raise Exception("Unknown data structure")
-        return {sheet_name: reader.to_array()}
+        rows = reader.to_array()
+        if keep_keys and struct == RECORDS:
+            rows = _keys_without_records(rows, keywords['custom_headers'])
+        if columns is not None and struct == DICT:
+            rows = project_rows(rows, columns)
+        # the keys of records come first, unless start_row left them out
+        header = struct == RECORDS and not keywords.get('start_row')
+        rows = apply_schema(rows, schema=schema, schema_rows=schema_rows,
+                            header=header)
+        if metrics is not None:
+            rows = metrics.time_parsing(rows)
+        return {sheet_name: rows}
 
     def parse_file_content(self, file_content, **keywords):
+        file_content = compression.decompress(file_content)
         return self.parse_file_stream(
             compact.StringIO(file_content), **keywords)
 
+    def _get_error_report(self, on_error, error_report):
+        if on_error == RAISE:
+            report = None
+        elif on_error in (SKIP, COLLECT):
+            report = error_report or ErrorReport(on_error)
+            report.on_error = on_error
+        else:
+            raise Exception("Unknown on_error %s" % on_error)
+        self.error_report = report
+        return report
+
 
-def json_loads(file_stream):
+def skip_lines(raw_lines, start_row=0, row_limit=-1, skip_row_func=None,
+               row_offset=0):
+    """
+    Drop the raw lines whose rows would be dropped, before decoding them
+
+    :param row_offset: the row index of the first line, which is 1 for
+                       records because their keys come first
+    """
+    skip_row = skip_row_func or _index_filter
+    for line_index, raw_line in enumerate(raw_lines):
+        position = skip_row(line_index + row_offset, start_row, row_limit)
+        if position == io_constants.SKIP_DATA:
+            continue
+        elif position == io_constants.STOP_ITERATION:
+            break
+        yield raw_line
+
+
+def json_loads(file_stream, loads=json.loads, report=None,
+               loads_lines=None, batch_size=1):
     """
     Simple load each line as json
+
+    With loads_lines, batch_size lines are decoded at a time. Bad lines
+    go to the error report if there is one, in which case lines are
+    decoded one by one so that each is told apart.
     """
     try:
+        if loads_lines is not None and report is None and batch_size > 1:
+            file_stream = iter(file_stream)
+            while True:
+                batch = list(itertools.islice(file_stream, batch_size))
+                if not batch:
+                    break
+                for row in loads_lines(batch):
+                    yield row
+            return
         for raw_row in file_stream:
-            yield json.loads(raw_row)
+            try:
+                yield loads(raw_row)
+            except ValueError as error:
+                if report is None:
+                    raise
+                report.add(error)
     except ValueError:
-        raise ValueError("There has been an json decode error."
-                         "Current version is not error tolerant")
+        raise ValueError(DECODE_ERROR)
+
+
+def _keys_without_records(rows, keys):
+    # the reader gives no keys if start_row and row_limit took every record
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        yield list(keys)
+        return
+    yield first_row
+    for row in rows:
+        yield row
+
+
+def _first_json_line(raw_lines, loads, report):
+    # returns the lines read and the first one that is json
+    peeked = []
+    for raw_line in raw_lines:
+        peeked.append(raw_line)
+        try:
+            return peeked, loads(raw_line)
+        except ValueError:
+            if report is None:
+                raise ValueError(DECODE_ERROR)
+    raise ValueError("No json line is found")
+
+
+def _watch_line_index(report, line_index, lines, start_line):
+    for index, line in enumerate(lines, start_line):
+        report.track(index + 1, line_index.offset(index))
+        yield line
+
+
+def _count_line_index(metrics, line_index, lines, start_line):
+    # the lines come without their new lines, the index knows their bytes
+    for index, line in enumerate(lines, start_line):
+        metrics.bytes_read += line_index.length(index)
+        yield line
 
 
 def detect_format(content_generator):
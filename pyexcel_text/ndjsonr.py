@@ -0,0 +1,93 @@
+"""
+    pyexcel_text.ndjsonr
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Render newline delimited json output
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+from pyexcel_text.jsonr import get_serializer
+from pyexcel_text.compression import CompressedRenderer
+from pyexcel_text.metrics import instrumented
+from pyexcel_text.jsonbackend import get_backend, STDLIB
+from pyexcel_text.ndjsonp import AUTO_DETECT, ARRAY, RECORDS, DICT
+
+
+class NDJsonifier(CompressedRenderer):
+    """
+    render ndjson, one json line per row
+    """
+    @instrumented
+    def render_sheet(self, sheet, struct=AUTO_DETECT, json_backend=None,
+                     date_format=None, datetime_format=None, **keywords):
+        for line in iter_ndjson(sheet, struct=struct,
+                                json_backend=json_backend,
+                                date_format=date_format,
+                                datetime_format=datetime_format):
+            self._stream.write(line)
+
+    @instrumented
+    def render_book(self, book, **keywords):
+        # sheets are simply concatenated, a blank line is not valid ndjson
+        for sheet in book:
+            self.render_sheet(sheet, **keywords)
+
+
+def iter_ndjson(sheet, struct=AUTO_DETECT, json_backend=None,
+                date_format=None, datetime_format=None, **keywords):
+    """
+    Yield the ndjson lines of the sheet, new lines included
+    """
+    backend = get_backend(json_backend, default=STDLIB)
+    default = get_serializer(date_format, datetime_format)
+    if struct == AUTO_DETECT:
+        struct = detect_struct(sheet)
+    if struct in WRITERS:
+        lines = WRITERS[struct](sheet)
+    else:
+        raise Exception("Unknown data structure")
+    for line in lines:
+        yield backend.dumps(line, default=default) + '\n'
+
+
+def detect_struct(sheet):
+    """
+    Pick the layout that the ndjson parser would detect back
+    """
+    if getattr(sheet, 'colnames', None):
+        return RECORDS
+    elif getattr(sheet, 'rownames', None):
+        return DICT
+    return ARRAY
+
+
+def array_lines(sheet):
+    return sheet.to_array()
+
+
+def records_lines(sheet):
+    if getattr(sheet, 'colnames', None) or getattr(sheet, 'rownames', None):
+        for record in sheet.to_records():
+            yield record
+    else:
+        rows = iter(sheet.to_array())
+        headers = next(rows, [])
+        for row in rows:
+            yield dict(zip(headers, row))
+
+
+def dict_lines(sheet):
+    for row in sheet.to_array():
+        row = list(row)
+        if len(row) == 2:
+            yield {row[0]: row[1]}
+        elif len(row) > 2:
+            yield {row[0]: row[1:]}
+
+
+WRITERS = {
+    ARRAY: array_lines,
+    RECORDS: records_lines,
+    DICT: dict_lines
+}
@@ -0,0 +1,126 @@
+"""
+    pyexcel_text.parallel
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Decode newline delimited json in a pool of processes
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import os
+import multiprocessing
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from pyexcel_text.jsonbackend import get_backend
+
+# big enough to amortise a task, small enough to keep the rows in
+# flight well below the size of a large file
+RANGE_SIZE = 4 * 1024 * 1024
+# ranges handed to the pool per worker, so that none waits for work
+TASKS_PER_WORKER = 2
+
+
+def byte_ranges(file_name, range_size=RANGE_SIZE):
+    """
+    Yield (start, end) byte ranges of about range_size bytes that end
+    at a new line
+    """
+    file_size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as f:
+        start = 0
+        while start < file_size:
+            f.seek(min(start + range_size, file_size))
+            f.readline()
+            end = min(f.tell(), file_size)
+            yield start, end
+            start = end
+
+
+def parallel_json_loads(file_name, workers, ordered=True, json_backend=None,
+                        range_size=RANGE_SIZE):
+    """
+    Load each line as json using several processes
+
+    The rows of a range are given out as soon as it is decoded, and at
+    most TASKS_PER_WORKER ranges per worker are in flight at a time.
+
+    :param workers: the number of processes
+    :param ordered: False lets rows come back in the order that the
+                    ranges finish
+    :param range_size: the bytes decoded by a task
+    """
+    backend_name = get_backend(json_backend).name
+    tasks = ((file_name, start, end, backend_name)
+             for start, end in byte_ranges(file_name, range_size))
+    pool = multiprocessing.Pool(workers)
+    try:
+        results = _bounded_map(pool, tasks, workers * TASKS_PER_WORKER,
+                               ordered)
+        for rows in results:
+            for row in rows:
+                yield row
+    except ValueError:
+        raise ValueError("There has been an json decode error."
+                         "Current version is not error tolerant")
+    finally:
+        pool.terminate()
+
+
+def decode_range(task):
+    """
+    Decode the lines between two byte offsets, run by the pool
+    """
+    file_name, start, end, backend_name = task
+    backend = get_backend(backend_name)
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode('utf-8').split('\n')
+    if lines and lines[-1] == '':
+        # the range ends with a new line
+        lines.pop()
+    return backend.loads_lines(lines)
+
+
+def _bounded_map(pool, tasks, limit, ordered):
+    """
+    Like pool.imap, except that no more than limit tasks are handed to
+    the pool before their results are taken
+    """
+    finished = Queue()
+    done = {}
+    submitted = 0
+    taken = 0
+    tasks = iter(tasks)
+    while True:
+        for task in tasks:
+            pool.apply_async(_decode_indexed, ((submitted, task),),
+                             callback=finished.put)
+            submitted += 1
+            if submitted - taken == limit:
+                break
+        if taken == submitted:
+            return
+        if ordered:
+            while taken not in done:
+                index, rows = finished.get()
+                done[index] = rows
+            rows = done.pop(taken)
+        else:
+            rows = finished.get()[1]
+        taken += 1
+        if isinstance(rows, Exception):
+            raise rows
+        yield rows
+
+
+def _decode_indexed(indexed_task):
+    # the error goes back as the result, python 2 has no error_callback
+    index, task = indexed_task
+    try:
+        return index, decode_range(task)
+    except Exception as error:
+        return index, error
@@ -0,0 +1,128 @@
+"""
+    pyexcel_text.records
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Turn a list of records into rows quickly
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import sys
+import itertools
+from operator import itemgetter
+
+import pyexcel.constants as constants
+from pyexcel._compact import OrderedDict, PY2
+from pyexcel.plugins.sources.pydata.common import (
+    RecordsReader as BaseRecordsReader)
+from pyexcel_io.utils import _index_filter
+import pyexcel_io.constants as io_constants
+
+BATCH_SIZE = 1000
+
+
+# pylint: disable=W0223
+class RecordsReader(BaseRecordsReader):
+    """
+    Same output as pyexcel's records reader, only faster
+
+    The keys are worked out once and interned. Rows are then picked
+    by one itemgetter, a batch at a time; a record that misses a key
+    falls back to the slow path with the default n/a, which is ''.
+    """
+    def row_iterator(self):
+        records = iter(self._native_sheet)
+        first_record = next(records, None)
+        if first_record is None:
+            return
+        headers = self._keywords.get('custom_headers')
+        if headers is None:
+            headers = get_keys(first_record)
+        headers = [_intern(key) for key in headers]
+        yield headers
+        getter = make_getter(headers)
+        records = itertools.chain([first_record], records)
+        while True:
+            batch = list(itertools.islice(records, BATCH_SIZE))
+            if not batch:
+                break
+            try:
+                rows = list(map(getter, batch))
+            except KeyError:
+                rows = [_get_row(getter, record, headers)
+                        for record in batch]
+            for row in rows:
+                yield row
+
+    def to_array(self):
+        if (self._start_column != 0 or self._column_limit != -1 or
+                self._skip_column is not _index_filter):
+            for row in BaseRecordsReader.to_array(self):
+                yield row
+            return
+        for row_index, row in enumerate(self.row_iterator()):
+            row_position = self._skip_row(
+                row_index, self._start_row, self._row_limit)
+            if row_position == io_constants.SKIP_DATA:
+                continue
+            elif row_position == io_constants.STOP_ITERATION:
+                break
+            row = list(row)
+            # trailing empty cells are dropped as pyexcel-io does
+            while row and (row[-1] is None or row[-1] == ''):
+                row.pop()
+            if self._skip_empty_rows and not row:
+                continue
+            if self._row_renderer:
+                row = self._row_renderer(row)
+            yield row
+
+
+def get_keys(record):
+    """
+    The keys of a record in the order pyexcel uses
+    """
+    if isinstance(record, OrderedDict):
+        return list(record.keys())
+    return sorted(record.keys())
+
+
+def make_getter(keys):
+    """
+    Return a function that picks the values of keys as a tuple
+    """
+    if len(keys) == 1:
+        single = itemgetter(keys[0])
+        return lambda record: (single(record),)
+    return itemgetter(*keys)
+
+
+def project_rows(rows, indices):
+    """
+    Keep the cells at indices of each row, '' standing in for the cells
+    that a short row does not have
+    """
+    for index in indices:
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise TypeError(
+                "Columns of arrays are picked by index, not %r" % index)
+    getter = make_getter(indices)
+    for row in rows:
+        try:
+            yield list(getter(row))
+        except IndexError:
+            yield [row[index] if -len(row) <= index < len(row)
+                   else constants.DEFAULT_NA for index in indices]
+
+
+def _get_row(getter, record, keys):
+    try:
+        return getter(record)
+    except KeyError:
+        return [record.get(key, constants.DEFAULT_NA) for key in keys]
+
+
+def _intern(key):
+    if PY2 or not isinstance(key, str):
+        return key
+    return sys.intern(key)
@@ -0,0 +1,255 @@
+"""
+    pyexcel_text.schema
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Work out the type of each column and convert the cells to it
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import re
+import datetime
+import itertools
+
+try:
+    INTEGER_TYPES = (int, long)
+    TEXT_TYPE = unicode
+except NameError:
+    INTEGER_TYPES = (int,)
+    TEXT_TYPE = str
+
+INFER = 'infer'
+DEFAULT_SAMPLE_ROWS = 1000
+
+# column types
+NONE = 'none'
+BOOL = 'bool'
+INT = 'int'
+FLOAT = 'float'
+DATE = 'date'
+DATETIME = 'datetime'
+TIME = 'time'
+TEXT = 'text'
+
+DATE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+DATETIME_PATTERN = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$')
+TIME_PATTERN = re.compile(r'^(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$')
+
+
+class Schema(object):
+    """
+    The types of the columns of a sheet
+
+    The types are either given, as a list in column order or a dict
+    keyed by column index or header, or inferred from the first
+    sample_rows rows. Rows then go through the converters of the
+    columns that need one. A cell that does not convert, or is empty,
+    is left as it is. types holds the outcome once rows have been read.
+    """
+    def __init__(self, types=INFER, sample_rows=None):
+        self.types = None
+        self._given = types
+        self._sample_rows = sample_rows or DEFAULT_SAMPLE_ROWS
+        self._converters = []
+
+    def apply(self, rows, header=False):
+        """
+        Yield the rows with their cells converted
+
+        :param header: True if the first row holds the column names,
+                       which is kept out of the sample and as it is
+        """
+        rows = iter(rows)
+        headers = None
+        if header:
+            headers = next(rows, None)
+            if headers is None:
+                return
+            yield headers
+        sample = list(itertools.islice(rows, self._sample_rows))
+        if self._given == INFER:
+            self.types = infer_types(sample)
+            # json has decoded the integers already
+            skipped = (INT,)
+        else:
+            self.types = resolve_types(self._given, headers, sample)
+            skipped = ()
+        self._converters = [(index, CONVERTERS[column_type])
+                            for index, column_type in enumerate(self.types)
+                            if CONVERTERS.get(column_type) is not None and
+                            column_type not in skipped]
+        for row in itertools.chain(sample, rows):
+            yield self.convert_row(row)
+
+    def convert_row(self, row):
+        if not self._converters:
+            return row
+        row = list(row)
+        length = len(row)
+        for index, converter in self._converters:
+            if index >= length:
+                break
+            value = row[index]
+            if value is None or value == '':
+                continue
+            try:
+                row[index] = converter(value)
+            except (ValueError, TypeError, AttributeError):
+                # AttributeError: the pattern of a date does not match
+                pass
+        return row
+
+
+def infer_types(rows):
+    """
+    The most generic type of the cells in each column
+    """
+    types = []
+    for row in rows:
+        if len(row) > len(types):
+            types.extend([NONE] * (len(row) - len(types)))
+        for index, value in enumerate(row):
+            found = types[index]
+            if found == TEXT:
+                continue
+            value_type = value_type_of(value)
+            if value_type == NONE or value_type == found:
+                continue
+            types[index] = more_generic(found, value_type)
+    return types
+
+
+def value_type_of(value):
+    """
+    The type of a decoded json value, strings being looked into for
+    the dates and times that jsonr writes
+    """
+    if value is None or value == '':
+        return NONE
+    elif value is True or value is False:
+        return BOOL
+    elif isinstance(value, INTEGER_TYPES):
+        return INT
+    elif isinstance(value, float):
+        return FLOAT
+    elif isinstance(value, datetime.datetime):
+        return DATETIME
+    elif isinstance(value, datetime.date):
+        return DATE
+    elif isinstance(value, datetime.time):
+        return TIME
+    elif isinstance(value, TEXT_TYPE):
+        if DATE_PATTERN.match(value):
+            return DATE
+        elif DATETIME_PATTERN.match(value):
+            return DATETIME
+        elif TIME_PATTERN.match(value):
+            return TIME
+    return TEXT
+
+
+def more_generic(found, value_type):
+    if found == NONE:
+        return value_type
+    pair = set([found, value_type])
+    if pair == set([INT, FLOAT]):
+        return FLOAT
+    elif pair == set([DATE, DATETIME]):
+        return DATETIME
+    return TEXT
+
+
+def resolve_types(given, headers, sample):
+    """
+    Turn the types given as a dict into a list in column order
+    """
+    if not isinstance(given, dict):
+        return list(given)
+    width = max([len(row) for row in sample] +
+                [len(headers or [])] +
+                [index + 1 for index in given
+                 if isinstance(index, INTEGER_TYPES)])
+    types = [TEXT] * width
+    for key, column_type in given.items():
+        if isinstance(key, INTEGER_TYPES):
+            index = key
+        elif headers is not None and key in headers:
+            index = list(headers).index(key)
+        else:
+            raise KeyError("No column is named %s" % key)
+        types[index] = column_type
+    return types
+
+
+def to_float(value):
+    if isinstance(value, float):
+        return value
+    return float(value)
+
+
+def to_int(value):
+    if isinstance(value, INTEGER_TYPES):
+        return value
+    elif isinstance(value, float) and not value.is_integer():
+        raise ValueError("%r is not an integer" % value)
+    return int(value)
+
+
+def to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    year, month, day = DATE_PATTERN.match(value).groups()
+    return datetime.date(int(year), int(month), int(day))
+
+
+def to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    elif isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    match = DATETIME_PATTERN.match(value)
+    if match is None:
+        return datetime.datetime.combine(to_date(value), datetime.time())
+    year, month, day, hour, minute, second, fraction = match.groups()
+    return datetime.datetime(int(year), int(month), int(day), int(hour),
+                             int(minute), int(second),
+                             _microsecond(fraction))
+
+
+def to_time(value):
+    if isinstance(value, datetime.time):
+        return value
+    hour, minute, second, fraction = TIME_PATTERN.match(value).groups()
+    return datetime.time(int(hour), int(minute), int(second),
+                         _microsecond(fraction))
+
+
+def _microsecond(fraction):
+    if fraction is None:
+        return 0
+    return int(fraction.ljust(6, '0'))
+
+
+CONVERTERS = {
+    NONE: None,
+    BOOL: None,
+    TEXT: None,
+    INT: to_int,
+    FLOAT: to_float,
+    DATE: to_date,
+    DATETIME: to_datetime,
+    TIME: to_time
+}
+
+
+def apply_schema(rows, schema=None, schema_rows=None, header=False):
+    """
+    Convert the rows by the schema, which can be a Schema, INFER or the
+    types of the columns. Without one, the rows are returned as they are.
+    """
+    if schema is None:
+        return rows
+    if not isinstance(schema, Schema):
+        schema = Schema(schema, sample_rows=schema_rows)
+    return schema.apply(rows, header=header)
@@ -0,0 +1,634 @@
+"""
+    pyexcel_text.tables
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Write plain text and html tables row by row
+
+    The column types, alignments and widths follow tabulate's rules, so
+    that the output is the same as tabulate's for plain ascii cells.
+
+    :copyright: (c) 2014-2017 by C. W.
+    :license: New BSD
+"""
+import re
+import math
+import weakref
+import threading
+import itertools
+from collections import namedtuple
+
+import tabulate
+from pyexcel._compact import zip_longest, OrderedDict
+
+try:
+    from html import escape
+except ImportError:
+    from cgi import escape
+
+try:
+    INTEGER_TYPES = (int, long)
+    TEXT_TYPE = unicode
+except NameError:
+    INTEGER_TYPES = (int,)
+    TEXT_TYPE = str
+
+# in the order of tabulate's _more_generic
+NONE, BOOL, INT, FLOAT, BINARY, TEXT = range(6)
+NUMBERS = (INT, FLOAT)
+MIN_PADDING = 2
+FLOAT_FORMAT = 'g'
+DECIMAL = 'decimal'
+LEFT = 'left'
+TRUNCATE = 'truncate'
+OVERFLOW = 'overflow'
+TRUNCATED_MARK = '~'
+DEFAULT_SAMPLE_ROWS = 1000
+DEFAULT_CACHED_SHEETS = 8
+MISSING = object()
+HTML_CHUNK_ROWS = 100
+HTML_RIGHT = ' style="text-align: right;"'
+HTML_TRUNCATED = ('\n<tfoot>\n<tr><td colspan="%d">truncated</td></tr>'
+                  '\n</tfoot>')
+_NOT_PLAIN = re.compile(u'[^\x20-\x7e]')
+# tabulate writes the empty first cells of rst tables as .. since 0.8.0
+RST_ESCAPE = hasattr(tabulate, '_rst_escape_first_column')
+
+Line = namedtuple('Line', ['begin', 'fill', 'sep', 'end'])
+DataRow = namedtuple('DataRow', ['begin', 'sep', 'end'])
+TableFormat = namedtuple('TableFormat', [
+    'lineabove', 'linebelowheader', 'linebetweenrows', 'linebelow',
+    'headerrow', 'datarow', 'padding', 'with_header_hide'])
+
+
+def _pipe_line(widths, aligns):
+    segments = []
+    for index, width in enumerate(widths):
+        if aligns is None:
+            segments.append('-' * width)
+        elif aligns[index] == DECIMAL:
+            segments.append('-' * (width - 1) + ':')
+        else:
+            segments.append(':' + '-' * (width - 1))
+    return '|' + '|'.join(segments) + '|'
+
+
+FORMATS = {
+    'simple': TableFormat(
+        lineabove=Line('', '-', '  ', ''),
+        linebelowheader=Line('', '-', '  ', ''),
+        linebetweenrows=None,
+        linebelow=Line('', '-', '  ', ''),
+        headerrow=DataRow('', '  ', ''),
+        datarow=DataRow('', '  ', ''),
+        padding=0,
+        with_header_hide=['lineabove', 'linebelow']),
+    'plain': TableFormat(
+        lineabove=None,
+        linebelowheader=None,
+        linebetweenrows=None,
+        linebelow=None,
+        headerrow=DataRow('', '  ', ''),
+        datarow=DataRow('', '  ', ''),
+        padding=0,
+        with_header_hide=None),
+    'grid': TableFormat(
+        lineabove=Line('+', '-', '+', '+'),
+        linebelowheader=Line('+', '=', '+', '+'),
+        linebetweenrows=Line('+', '-', '+', '+'),
+        linebelow=Line('+', '-', '+', '+'),
+        headerrow=DataRow('|', '|', '|'),
+        datarow=DataRow('|', '|', '|'),
+        padding=1,
+        with_header_hide=None),
+    'pipe': TableFormat(
+        lineabove=_pipe_line,
+        linebelowheader=_pipe_line,
+        linebetweenrows=None,
+        linebelow=None,
+        headerrow=DataRow('|', '|', '|'),
+        datarow=DataRow('|', '|', '|'),
+        padding=1,
+        with_header_hide=['lineabove']),
+    'orgtbl': TableFormat(
+        lineabove=None,
+        linebelowheader=Line('|', '-', '+', '|'),
+        linebetweenrows=None,
+        linebelow=None,
+        headerrow=DataRow('|', '|', '|'),
+        datarow=DataRow('|', '|', '|'),
+        padding=1,
+        with_header_hide=None),
+    'rst': TableFormat(
+        lineabove=Line('', '=', '  ', ''),
+        linebelowheader=Line('', '=', '  ', ''),
+        linebetweenrows=None,
+        linebelow=Line('', '=', '  ', ''),
+        headerrow=DataRow('', '  ', ''),
+        datarow=DataRow('', '  ', ''),
+        padding=0,
+        with_header_hide=None)
+}
+
+
+def cell_type(value):
+    """
+    The least generic type of a cell as tabulate sees it
+    """
+    value_type = type(value)
+    if value is None:
+        return NONE
+    elif value_type is bool:
+        return BOOL
+    elif value_type in INTEGER_TYPES:
+        return INT
+    elif value_type is float:
+        return FLOAT
+    elif isinstance(value, (TEXT_TYPE, bytes)):
+        return _string_type(value)
+    elif hasattr(value, 'isoformat'):
+        return TEXT
+    try:
+        float(value)
+        return FLOAT
+    except (ValueError, TypeError):
+        return TEXT
+
+
+def _string_type(value):
+    if value in ('True', 'False'):
+        return BOOL
+    try:
+        int(value)
+        return INT
+    except (ValueError, TypeError):
+        pass
+    try:
+        number = float(value)
+        if math.isinf(number) or math.isnan(number):
+            if value.lower() in ['inf', '-inf', 'nan']:
+                return FLOAT
+        else:
+            return FLOAT
+    except (ValueError, TypeError):
+        pass
+    if isinstance(value, bytes) and not isinstance(value, TEXT_TYPE):
+        return BINARY
+    return TEXT
+
+
+def format_cell(value, column_type):
+    """
+    The text of a cell in a column of the given type
+    """
+    if value is None:
+        return ''
+    elif column_type == FLOAT:
+        try:
+            return format(float(value), FLOAT_FORMAT)
+        except (ValueError, TypeError):
+            # a late row that does not fit a sampled column
+            return "{0}".format(value)
+    elif column_type == BINARY:
+        try:
+            return TEXT_TYPE(value, 'ascii')
+        except TypeError:
+            return TEXT_TYPE(value)
+    elif type(value) is TEXT_TYPE:
+        return value
+    return "{0}".format(value)
+
+
+def is_plain(texts):
+    """
+    Tell if the texts are all printable ascii
+    """
+    return _NOT_PLAIN.search(u''.join(texts)) is None
+
+
+def afterpoint(text, column_type):
+    """
+    The number of symbols after the decimal point, -1 if there is none
+    """
+    if column_type != FLOAT:
+        return -1
+    position = text.rfind('.')
+    if position < 0:
+        position = text.rfind('e')
+    if position < 0:
+        return -1
+    return len(text) - position - 1
+
+
+def truncate(text, width, column_type):
+    """
+    Cut a text to the width and mark it so. Numbers are never cut.
+    """
+    if column_type in NUMBERS or _string_type(text.strip()) in NUMBERS:
+        return text
+    return text[:max(width - len(TRUNCATED_MARK), 0)] + TRUNCATED_MARK
+
+
+class Layout(object):
+    """
+    Column types, alignments and widths, learnt from the rows shown to it
+    """
+    def __init__(self, headers=None, escape_first_column=False):
+        self.headers = headers
+        self.types = []
+        self.aligns = None
+        self.widths = []
+        self._escape = escape_first_column
+        self._integers = []
+        self._decimals = []
+
+    def number_of_columns(self):
+        return max(len(self.types), len(self.headers or []))
+
+    def learn_types(self, rows):
+        types = self.types
+        for row in rows:
+            if len(row) > len(types):
+                types.extend([BOOL] * (len(row) - len(types)))
+            for index, value in enumerate(self.escape(row)):
+                value_type = cell_type(value)
+                if value_type > types[index]:
+                    types[index] = value_type
+        if types:
+            self.aligns = [DECIMAL if column_type in NUMBERS else LEFT
+                           for column_type in types]
+        # columns without a cell have no decimals
+        self._integers = [0] * len(types)
+        self._decimals = [-1] * len(types)
+
+    def learn_widths(self, rows, formatted=False):
+        """
+        :param formatted: True if the rows come from format_row already
+        """
+        integers = self._integers
+        decimals = self._decimals
+        for row in rows:
+            if not formatted:
+                row = self.format_row(row)
+            for index, text in enumerate(row):
+                if self.aligns[index] == DECIMAL:
+                    point = afterpoint(text, self.types[index])
+                    if len(text) - point > integers[index]:
+                        integers[index] = len(text) - point
+                    if point > decimals[index]:
+                        decimals[index] = point
+                elif len(text.strip()) > integers[index]:
+                    integers[index] = len(text.strip())
+        self._finish_widths()
+
+    def _finish_widths(self):
+        if self.headers and self.types:
+            # as tabulate does, headers are fitted to the columns
+            headers = list(self.headers)[:len(self.types)]
+            missing = len(self.types) - len(headers)
+            self.headers = [''] * missing + headers
+        if self.headers and self._escape:
+            self.headers = self.escape(self.headers)
+        if self.types:
+            widths = [integer + decimal if align == DECIMAL else integer
+                      for integer, decimal, align in zip(
+                          self._integers, self._decimals, self.aligns)]
+        else:
+            # tabulate leaves room for an empty cell below each header
+            widths = [0] * len(self.headers or [])
+        if self.headers:
+            widths = [max(width, len(header) + MIN_PADDING)
+                      for width, header in zip_longest(
+                          widths, self.headers, fillvalue='')]
+        self.widths = widths
+
+    def escape(self, row):
+        # empty cells of the first column are written as .. in rst
+        if self._escape and row:
+            first = row[0]
+            if isinstance(first, (TEXT_TYPE, bytes)) and not first.strip():
+                row = ['..'] + list(row[1:])
+        return row
+
+    def format_row(self, row):
+        row = self.escape(row)
+        texts = [format_cell(value, column_type)
+                 for value, column_type in zip(row, self.types)]
+        if len(texts) < len(self.types):
+            texts.extend([''] * (len(self.types) - len(texts)))
+        elif len(row) > len(self.types):
+            texts.extend(format_cell(value, TEXT)
+                         for value in row[len(self.types):])
+        return texts
+
+    def align_row(self, texts, overflow=OVERFLOW):
+        cells = []
+        for index, text in enumerate(texts):
+            if index >= len(self.widths):
+                cells.append(text)
+                continue
+            width = self.widths[index]
+            if self.aligns[index] == DECIMAL:
+                point = afterpoint(text, self.types[index])
+                spaces = self._decimals[index] - point
+                if spaces > 0:
+                    text += ' ' * spaces
+                cell = text.rjust(width)
+            else:
+                cell = text.strip().ljust(width)
+            if overflow == TRUNCATE and len(cell) > width:
+                cell = truncate(cell, width, self.types[index])
+            cells.append(cell)
+        return cells
+
+    def align_headers(self):
+        aligns = self.aligns or [LEFT] * len(self.headers)
+        return [header.ljust(width) if align == LEFT else header.rjust(width)
+                for header, width, align in zip(
+                    self.headers, self.widths, aligns)]
+
+
+class TableWriter(object):
+    """
+    Write a table in one of FORMATS, line by line, into a stream
+
+    :param sample_rows: None to go through the rows three times: for the
+                        types, for the widths and for the output, which
+                        needs rows that can be iterated again, e.g. a list.
+                        Otherwise the layout is learnt from the first
+                        sample_rows rows only and the rows are read once.
+    :param overflow: what to do with a later cell that is wider than its
+                     sampled column: 'overflow' lets it push the rest of
+                     the row to the right, 'truncate' cuts text and ends
+                     it with ~ but leaves numbers whole
+    """
+    def __init__(self, tablefmt, sample_rows=None, overflow=OVERFLOW):
+        if tablefmt not in FORMATS:
+            raise Exception("%s is not supported" % tablefmt)
+        if overflow not in (TRUNCATE, OVERFLOW):
+            raise Exception("Unknown overflow %s" % overflow)
+        self._format = FORMATS[tablefmt]
+        self._escape = tablefmt == 'rst' and RST_ESCAPE
+        self._sample_rows = sample_rows
+        self._overflow = overflow
+
+    def write(self, stream, rows, headers=None):
+        """
+        Write the rows into the stream
+        """
+        for chunk in self.chunks(rows, headers=headers):
+            stream.write(chunk)
+
+    def chunks(self, rows, headers=None):
+        """
+        Yield the table line by line, the new lines in between included
+        """
+        layout = Layout(headers, escape_first_column=self._escape)
+        if self._sample_rows is None:
+            layout.learn_types(rows)
+            layout.learn_widths(rows)
+            overflow = OVERFLOW
+        else:
+            rows = iter(rows)
+            sample = list(itertools.islice(rows, self._sample_rows))
+            layout.learn_types(sample)
+            layout.learn_widths(sample)
+            rows = itertools.chain(sample, rows)
+            overflow = self._overflow
+        if not layout.number_of_columns():
+            return
+        lines = self.lines(layout, rows, overflow)
+        yield next(lines)
+        for line in lines:
+            yield '\n' + line
+
+    def render(self, rows, headers=None):
+        """
+        Return the table as a string, formatting each cell only once
+
+        None is returned if a cell is not printable ascii, e.g. it has
+        wide characters, colours or new lines, which tabulate is left to
+        handle.
+        """
+        prepared = self.prepare(rows, headers)
+        if prepared is None:
+            return None
+        return self.render_prepared(prepared)
+
+    def prepare(self, rows, headers=None):
+        """
+        Return the layout and the formatted cells of the table, which do
+        not depend on the format except for rst, or None
+        """
+        if headers and not is_plain(headers):
+            return None
+        layout = Layout(headers, escape_first_column=self._escape)
+        layout.learn_types(rows)
+        table = []
+        for row in rows:
+            texts = layout.format_row(row)
+            if not is_plain(texts):
+                return None
+            table.append(texts)
+        layout.learn_widths(table, formatted=True)
+        return layout, table
+
+    def render_prepared(self, prepared):
+        layout, table = prepared
+        if not layout.number_of_columns():
+            return ''
+        return '\n'.join(self.lines(layout, table, formatted=True))
+
+    def lines(self, layout, rows, overflow=OVERFLOW, formatted=False):
+        table_format = self._format
+        hidden = []
+        if layout.headers and table_format.with_header_hide:
+            hidden = table_format.with_header_hide
+        padding = table_format.padding
+        widths = [width + 2 * padding for width in layout.widths]
+        if table_format.lineabove and 'lineabove' not in hidden:
+            yield self._line(table_format.lineabove, widths, layout.aligns)
+        if layout.headers:
+            yield self._row(table_format.headerrow, layout.align_headers())
+            if table_format.linebelowheader:
+                yield self._line(table_format.linebelowheader, widths,
+                                 layout.aligns)
+        between = table_format.linebetweenrows
+        previous = None
+        for row in rows:
+            if previous is not None:
+                yield previous
+                if between:
+                    yield self._line(between, widths, layout.aligns)
+            if not formatted:
+                row = layout.format_row(row)
+            cells = layout.align_row(row, overflow)
+            previous = self._row(table_format.datarow, cells)
+        if previous is not None:
+            yield previous
+        if table_format.linebelow and 'linebelow' not in hidden:
+            yield self._line(table_format.linebelow, widths, layout.aligns)
+
+    def _row(self, data_row, cells):
+        if cells:
+            pad = ' ' * self._format.padding
+            cells = [pad + cell + pad for cell in cells]
+        return (data_row.begin + data_row.sep.join(cells) +
+                data_row.end).rstrip()
+
+    def _line(self, line, widths, aligns):
+        if callable(line):
+            return line(widths, aligns)
+        return (line.begin + line.sep.join(line.fill * width
+                                           for width in widths) +
+                line.end).rstrip()
+
+
+def fingerprint(table):
+    """
+    Return a hash of the cells and their types, or None if a cell
+    cannot be hashed
+    """
+    try:
+        return hash(tuple(tuple(row) + tuple(map(type, row))
+                          for row in table))
+    except TypeError:
+        return None
+
+
+class LayoutCache(object):
+    """
+    Keep the prepared layouts of the last few sheets rendered
+
+    A sheet is known by its identity and the fingerprint of its cells,
+    a hash taken once per render, so an edited sheet is laid out again
+    while nothing but the prepared layout is kept.
+
+    :param max_sheets: the least recently used sheet goes beyond that
+    """
+    def __init__(self, max_sheets=DEFAULT_CACHED_SHEETS):
+        self._max_sheets = max_sheets
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sheet, tablefmt, cells_hash):
+        """
+        Return what TableWriter.prepare gave for the sheet, or MISSING
+
+        :param cells_hash: the fingerprint of the cells as they are now
+        """
+        key = self._key(sheet, tablefmt)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                reference, known_hash, prepared = entry
+                if (reference() is sheet and cells_hash is not None and
+                        known_hash == cells_hash):
+                    self._entries.pop(key)
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return prepared
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def put(self, sheet, tablefmt, cells_hash, prepared):
+        if cells_hash is None:
+            return
+        key = self._key(sheet, tablefmt)
+        entry = (weakref.ref(sheet), cells_hash, prepared)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self._max_sheets:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, sheet=None):
+        """
+        Forget the sheet, or every sheet if none is given
+        """
+        with self._lock:
+            if sheet is None:
+                self._entries.clear()
+            else:
+                for rst in (False, True):
+                    self._entries.pop((id(sheet), rst), None)
+
+    def _key(self, sheet, tablefmt):
+        # rst is the only format that changes the cells
+        return id(sheet), tablefmt == 'rst'
+
+
+class HtmlWriter(object):
+    """
+    Write an html table a chunk of rows at a time
+
+    Nothing is measured ahead, so the first rows go out straight away.
+    Cells are not padded and each number is aligned right on its own.
+
+    :param max_rows: stop after so many rows and end the table with a
+                     footer that says it is truncated
+    :param chunk_rows: the number of rows written to the stream at once
+    """
+    def __init__(self, max_rows=None, chunk_rows=HTML_CHUNK_ROWS):
+        self._max_rows = max_rows
+        self._chunk_rows = chunk_rows
+        self.truncated = False
+
+    def write(self, stream, rows, headers=None):
+        """
+        Write the rows, returns True if they are cut short by max_rows
+        """
+        for chunk in self.chunks(rows, headers=headers):
+            stream.write(chunk)
+        return self.truncated
+
+    def chunks(self, rows, headers=None):
+        """
+        Yield the table a chunk of rows at a time
+        """
+        self.truncated = False
+        rows = iter(rows)
+        if self._max_rows is not None:
+            rows = itertools.islice(rows, self._max_rows + 1)
+        if headers:
+            yield ('<table>\n<thead>\n%s\n</thead>\n<tbody>' %
+                   html_row(headers, 'th'))
+        else:
+            yield '<table>\n<tbody>'
+        columns = len(headers or [])
+        written = 0
+        while True:
+            chunk = list(itertools.islice(rows, self._chunk_rows))
+            if self._max_rows is not None and \
+                    written + len(chunk) > self._max_rows:
+                chunk = chunk[:self._max_rows - written]
+                self.truncated = True
+            if not chunk:
+                break
+            for row in chunk:
+                columns = max(columns, len(row))
+            yield ''.join('\n' + html_row(row) for row in chunk)
+            written += len(chunk)
+        yield '\n</tbody>'
+        if self.truncated:
+            yield HTML_TRUNCATED % max(columns, 1)
+        yield '\n</table>'
+
+
+def html_row(row, cell_tag='td'):
+    """
+    One escaped row of an html table
+    """
+    cells = []
+    for value in row:
+        value_type = cell_type(value)
+        if value_type in NUMBERS and cell_tag == 'td':
+            style = HTML_RIGHT
+        else:
+            style = ''
+        cells.append('<%s%s>%s</%s>' % (
+            cell_tag, style, escape(format_cell(value, value_type)),
+            cell_tag))
+    return '<tr>%s</tr>' % ''.join(cells)
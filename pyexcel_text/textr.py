@@ -7,20 +7,74 @@
     :copyright: (c) 2014-2017 by C. W.
     :license: New BSD
 """
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import tabulate
 
+from pyexcel import constants
+from pyexcel._compact import StringIO
 from pyexcel.internal import SheetStream
 from pyexcel.internal.sheets.matrix import uniform
 from pyexcel.renderer import Renderer
 
+from pyexcel_text import tables
+from pyexcel_text.metrics import instrumented
+
 
 class Tabulater(Renderer):
-    def render_sheet(self, sheet):
-        content = tabulating(sheet, self._file_type, self._write_title)
-        self._stream.write(content)
+    """
+    Render a sheet as a text table
+
+    simple, plain, grid, pipe, orgtbl and rst tables of printable ascii
+    are laid out by pyexcel_text.tables, the rest by tabulate. With
+    streaming=True, the same formats and html are written line by line.
+    See stream_tabulating.
+
+    Pass a tables.LayoutCache as cache to keep the formatted cells and
+    the column widths of a sheet that is rendered again and again.
+    """
+    @instrumented
+    def render_sheet(self, sheet, streaming=False, sample_rows=None,
+                     overflow=tables.OVERFLOW, max_rows=None, cache=None,
+                     **keywords):
+        if streaming:
+            stream_tabulating(self._stream, sheet, self._file_type,
+                              self._write_title, sample_rows=sample_rows,
+                              overflow=overflow, max_rows=max_rows)
+        else:
+            content = tabulating(sheet, self._file_type, self._write_title,
+                                 cache=cache)
+            self._stream.write(content)
 
+    @instrumented
+    def render_book(self, book, workers=1, threads=False, **keywords):
+        """
+        Render the sheets one after another
 
-def tabulating(sheet, file_type, write_title):
+        :param workers: the number of processes, or threads if threads
+                        is True, that format the sheets. Each sheet is
+                        written out in order as soon as it is ready.
+                        1, the default, is faster unless the sheets are
+                        large, see benchmarks/books.py.
+        """
+        if workers > 1:
+            contents = tabulating_in_parallel(
+                book, self._file_type, self._write_title, workers,
+                threads=threads, **keywords)
+            for index, content in enumerate(contents):
+                if index > 0:
+                    self._stream.write('\n')
+                self._stream.write(content)
+        else:
+            for index, sheet in enumerate(book):
+                if index > 0:
+                    self._stream.write('\n')
+                self.render_sheet(sheet, **keywords)
+
+
+def tabulating(sheet, file_type, write_title, cache=None):
     content = ""
     if write_title:
         content += "%s:\n" % sheet.name
@@ -33,8 +87,150 @@ def tabulating(sheet, file_type, write_title):
         if len(sheet.colnames) > 0:
             keywords['headers'] = 'firstrow'
         table = sheet.to_array()
-    content += tabulate.tabulate(
-        table,
-        tablefmt=file_type,
-        **keywords)
+        if cache is not None:
+            keywords['sheet'] = sheet
+            keywords['cache'] = cache
+    content += _tabulate(table, file_type, **keywords)
     return content
+
+
+def _tabulate(table, file_type, sheet=None, cache=None, **keywords):
+    # the common formats are laid out here, the same as tabulate does
+    if (file_type in tables.FORMATS and table and
+            not getattr(tabulate, 'PRESERVE_WHITESPACE', False)):
+        writer = tables.TableWriter(file_type)
+        prepared = tables.MISSING
+        if cache is not None:
+            cells_hash = tables.fingerprint(table)
+            prepared = cache.get(sheet, file_type, cells_hash)
+        if prepared is tables.MISSING:
+            headers = None
+            rows = table
+            if keywords.get('headers') == 'firstrow':
+                headers = [tables.TEXT_TYPE(header) for header in table[0]]
+                rows = table[1:]
+            prepared = writer.prepare(rows, headers)
+            if cache is not None:
+                cache.put(sheet, file_type, cells_hash, prepared)
+        if prepared is not None:
+            return writer.render_prepared(prepared)
+    return tabulate.tabulate(table, tablefmt=file_type, **keywords)
+
+
+def stream_tabulating(stream, sheet, file_type, write_title,
+                      sample_rows=None, overflow=tables.OVERFLOW,
+                      max_rows=None):
+    """
+    Write the table into the stream without building it in memory
+
+    The column widths of a sheet are found in a pass over its rows ahead
+    of the output, which is then the same as tabulate's. A sheet stream
+    can only be read once, so its widths come from the first sample_rows
+    rows, 1000 by default, and wider cells later on push the rest of the
+    row to the right, or are cut and marked with ~ if overflow is
+    'truncate'. Numbers are never cut. Its rows are padded to the sampled
+    width. If a sampled cell has new lines, the whole sheet is read and
+    laid out by tabulate instead, but cells of many lines after the
+    sample come out garbled. html rows are not measured and go out as
+    they come, max_rows of them at most.
+    """
+    for chunk in iter_tabulating(sheet, file_type, write_title,
+                                 sample_rows=sample_rows, overflow=overflow,
+                                 max_rows=max_rows):
+        stream.write(chunk)
+
+
+def iter_tabulating(sheet, file_type, write_title, sample_rows=None,
+                    overflow=tables.OVERFLOW, max_rows=None, cache=None,
+                    **keywords):
+    """
+    Yield the table line by line, see stream_tabulating
+
+    The formats that tabulate lays out come in one piece.
+    """
+    if file_type not in tables.FORMATS and file_type != 'html':
+        yield tabulating(sheet, file_type, write_title, cache=cache)
+        return
+    if write_title:
+        yield "%s:\n" % sheet.name
+    headers = None
+    if isinstance(sheet, SheetStream):
+        if sample_rows is None:
+            sample_rows = tables.DEFAULT_SAMPLE_ROWS
+        rows = iter(sheet.to_array())
+        width, sample = uniform(
+            [list(row) for row in itertools.islice(rows, sample_rows)])
+        if file_type != 'html' and _has_new_lines(sample):
+            # tabulate lays out the cells of many lines
+            table = sample + [list(row) for row in rows]
+            width, table = uniform(table)
+            yield _tabulate(table, file_type)
+            return
+        rows = itertools.chain(
+            sample, (_uniform_row(row, width) for row in rows))
+    else:
+        rows = sheet.to_array()
+        if len(sheet.colnames) > 0 and rows:
+            headers = [tables.TEXT_TYPE(header) for header in rows[0]]
+            rows = rows[1:]
+    if file_type == 'html':
+        writer = tables.HtmlWriter(max_rows=max_rows)
+    else:
+        writer = tables.TableWriter(file_type, sample_rows=sample_rows,
+                                    overflow=overflow)
+    for chunk in writer.chunks(rows, headers=headers):
+        yield chunk
+
+
+def _uniform_row(row, width):
+    row = [constants.DEFAULT_NA if cell is None else cell for cell in row]
+    if len(row) < width:
+        row += [constants.DEFAULT_NA] * (width - len(row))
+    return row
+
+
+def _has_new_lines(rows):
+    return any('\n' in cell for row in rows for cell in row
+               if isinstance(cell, (tables.TEXT_TYPE, str)))
+
+
+def tabulating_in_parallel(book, file_type, write_title, workers,
+                           threads=False, **keywords):
+    """
+    Format the sheets of a book in a pool and yield them in order
+    """
+    if threads:
+        pool = ThreadPool(workers)
+        tasks = ((sheet, file_type, write_title, keywords)
+                 for sheet in book)
+    else:
+        pool = multiprocessing.Pool(workers)
+        # a cache cannot be shared with other processes
+        keywords.pop('cache', None)
+        tasks = ((_picklable(sheet), file_type, write_title, keywords)
+                 for sheet in book)
+    try:
+        for content in pool.imap(render_task, tasks):
+            yield content
+    finally:
+        pool.terminate()
+
+
+def render_task(task):
+    """
+    Render one sheet to a string, in a worker
+    """
+    sheet, file_type, write_title, keywords = task
+    stream = StringIO()
+    renderer = Tabulater(file_type)
+    renderer.set_write_title(write_title)
+    renderer.set_output_stream(stream)
+    renderer.render_sheet(sheet, **keywords)
+    return stream.getvalue()
+
+
+def _picklable(sheet):
+    # the rows of a sheet stream come from a generator
+    if isinstance(sheet, SheetStream):
+        return SheetStream(sheet.name, list(sheet.to_array()))
+    return sheet
@@ -1,2 +1,2 @@
 pip freeze
-nosetests --with-cov --cover-package pyexcel_text --cover-package tests --with-doctest --doctest-extension=.rst README.rst tests  pyexcel_text && flake8 . --exclude=.moban.d --builtins=unicode,xrange,long
+nosetests --with-cov --cover-package pyexcel_text --cover-package tests --with-doctest --doctest-extension=.rst --ignore-files="^\." --ignore-files="^_" --ignore-files="^setup\.py$" --ignore-files="^aio\.py$" README.rst tests  pyexcel_text && flake8 . --exclude=.moban.d --builtins=unicode,xrange,long
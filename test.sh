@@ -1,2 +1,5 @@
 pip freeze
-nosetests --with-cov --cover-package pyexcel_text --cover-package tests --with-doctest --doctest-extension=.rst README.rst tests  pyexcel_text && flake8 . --exclude=.moban.d --builtins=unicode,xrange,long
+# the async generators of aio.py are not python before 3.6
+EXCLUDE=.moban.d
+python -c "import sys; sys.exit(sys.version_info < (3, 6))" || EXCLUDE=.moban.d,aio.py
+nosetests --with-cov --cover-package pyexcel_text --cover-package tests --with-doctest --doctest-extension=.rst --ignore-files='^\.' --ignore-files='^_' --ignore-files='^setup\.py$' --ignore-files='^aio\.py$' README.rst tests  pyexcel_text && flake8 . --exclude=$EXCLUDE --builtins=unicode,xrange,long
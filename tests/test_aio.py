@@ -0,0 +1,127 @@
+import sys
+import json
+
+from nose.tools import eq_
+from nose.plugins.skip import SkipTest
+import pyexcel as pe
+
+if sys.version_info >= (3, 6):
+    import asyncio
+    from pyexcel_text import aio
+
+
+class ChunkReader(object):
+    """only has read(size)"""
+    def __init__(self, content, size):
+        self._content = content
+        self._size = size
+
+    def read(self, size):
+        chunk = self._content[:self._size]
+        self._content = self._content[self._size:]
+        return asyncio.sleep(0, result=chunk)
+
+
+class Writer(object):
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        return asyncio.sleep(0)
+
+
+class TestAsync:
+    def setUp(self):
+        if sys.version_info < (3, 6):
+            raise SkipTest("asyncio generators need python 3.6")
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_ndjson_records(self):
+        content = b'{"a": 1, "b": 2}\n{"a": 3, "b": 4}\n{"a": 5}\n'
+        rows = self._collect(aio.aparse_ndjson(self._reader(content),
+                                               batch_size=2))
+        eq_(rows, [['a', 'b'], [1, 2], [3, 4], [5]])
+
+    def test_ndjson_read_only(self):
+        content = u'[1, "é"]\n[3, 4]'.encode('utf-8')
+        rows = self._collect(aio.aparse_ndjson(ChunkReader(content, 3)))
+        eq_(rows, [[1, u'é'], [3, 4]])
+
+    def test_json_array(self):
+        content = json.dumps([[1, 2], [3, 4], [5, 6]]).encode('utf-8')
+        rows = self._collect(aio.aparse_json(ChunkReader(content, 4),
+                                             batch_size=2))
+        eq_(rows, [[1, 2], [3, 4], [5, 6]])
+
+    def test_json_records(self):
+        content = json.dumps([{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+        rows = self._collect(aio.aparse_json(
+            ChunkReader(content.encode('utf-8'), 5), batch_size=1))
+        eq_(rows, [['a', 'b'], [1, 2], [3, 4]])
+
+    def test_json_book(self):
+        content = json.dumps({"s1": [[1]], "s2": [[2]]}).encode('utf-8')
+        rows = self._collect(aio.aparse_json(ChunkReader(content, 4),
+                                             sheet_name='s2'))
+        eq_(rows, [[2]])
+
+    def test_json_long_value(self):
+        content = json.dumps([['x' * 100000], [1]]).encode('utf-8')
+        rows = self._collect(aio.aparse_json(ChunkReader(content, 7),
+                                             chunk_size=16))
+        eq_(rows, [['x' * 100000], [1]])
+
+    def test_feed_stream(self):
+        source = aio._FeedStream()
+        source.feed(b'ab')
+        source.feed(b'cde')
+        eq_(source.read(4), b'abcd')
+        eq_(source.read(4), b'e')
+        try:
+            source.read(8)
+        except aio.NeedMoreData:
+            eq_(source.wanted, 8)
+        else:
+            raise AssertionError("NeedMoreData not raised")
+        source.feed(b'')
+        eq_(source.read(8), b'')
+
+    def test_empty_json_array(self):
+        rows = self._collect(aio.aparse_json(ChunkReader(b' [ ] ', 1)))
+        eq_(rows, [])
+
+    def test_render(self):
+        sheet = pe.Sheet([[1, 2], [3, 4]], name='test')
+        for file_type in ['json', 'ndjson', 'grid']:
+            writer = Writer()
+            self.loop.run_until_complete(
+                aio.arender(writer, sheet, file_type, encoding='utf-8'))
+            expected = sheet.save_to_memory(file_type).getvalue()
+            eq_(b''.join(writer.chunks).decode('utf-8'), expected)
+
+    def test_render_book(self):
+        book = pe.get_book(bookdict={'a': [[1]], 'b': [[2]]})
+        writer = Writer()
+        self.loop.run_until_complete(
+            aio.arender_book(writer, book, 'simple'))
+        eq_(''.join(writer.chunks), book.save_to_memory('simple').getvalue())
+
+    def _reader(self, content):
+        reader = asyncio.StreamReader(loop=self.loop) \
+            if sys.version_info < (3, 10) else asyncio.StreamReader()
+        reader.feed_data(content)
+        reader.feed_eof()
+        return reader
+
+    def _collect(self, async_generator):
+        rows = []
+        while True:
+            try:
+                rows.append(self.loop.run_until_complete(
+                    async_generator.__anext__()))
+            except StopAsyncIteration:
+                return rows
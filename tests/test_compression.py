@@ -0,0 +1,118 @@
+import os
+import gzip
+from io import BytesIO
+from unittest import SkipTest
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel.parser import AbstractParser
+from pyexcel.plugins import IOPluginInfo
+from pyexcel.internal import PARSER
+from pyexcel.exceptions import FileTypeNotSupported
+from pyexcel_text import compression
+from pyexcel_text.ndjsonp import NDJsonParser
+
+
+class CsvGzParser(AbstractParser):
+    """a parser of another plugin for the same suffix"""
+    def parse_file(self, file_name, **keywords):
+        with gzip.open(file_name, 'rb') as f:
+            lines = f.read().decode('utf-8').split()
+        return {'csv': [line.split(',') for line in lines]}
+
+
+class TestCompressedFiles:
+
+    def setUp(self):
+        self.data = [[1, 2, 3], [4, 5, 6]]
+        self.test_file = None
+
+    def test_json_gz(self):
+        self._round_trip('test.json.gz')
+
+    def test_json_bz2(self):
+        self._round_trip('test.json.bz2')
+
+    def test_ndjson_xz(self):
+        self._round_trip('test.ndjson.xz')
+
+    def test_ndjson_zst(self):
+        try:
+            import zstandard  # noqa
+        except ImportError:
+            raise SkipTest("zstandard is not installed")
+        self._round_trip('test.ndjson.zst')
+
+    def test_magic_bytes(self):
+        self.test_file = 'test_gzipped.ndjson'
+        with gzip.open(self.test_file, 'wb') as f:
+            f.write(b'[1, 2, 3]\n[4, 5, 6]\n')
+        eq_(compression.detect(self.test_file), compression.GZIP)
+        eq_(pe.get_array(file_name=self.test_file), self.data)
+
+    def test_memory(self):
+        content = pe.save_as(array=self.data, dest_file_type='json.gz')
+        eq_(gzip.GzipFile(fileobj=content).read(),
+            b'{"pyexcel_sheet1": [[1, 2, 3], [4, 5, 6]]}')
+        array = pe.get_array(file_content=content.getvalue(),
+                             file_type='json.gz')
+        eq_(array, self.data)
+
+    def test_stream(self):
+        json_stream = BytesIO(_gzip(b'[[1, 2, 3], [4, 5, 6]]'))
+        eq_(pe.get_array(file_stream=json_stream, file_type='json.gz'),
+            self.data)
+        ndjson_stream = BytesIO(_gzip(b'[1, 2, 3]\n[4, 5, 6]\n'))
+        eq_(pe.get_array(file_stream=ndjson_stream, file_type='ndjson.gz'),
+            self.data)
+
+    def test_stream_with_magic_bytes(self):
+        stream = BytesIO(_gzip(b'[1, 2, 3]\n[4, 5, 6]\n'))
+        eq_(pe.get_array(file_stream=stream, file_type='ndjson'), self.data)
+
+    def test_uncompressed_stream(self):
+        stream = BytesIO(b'[1, 2, 3]\n[4, 5, 6]\n')
+        eq_(compression.open_stream(stream, 'ndjson'), stream)
+        eq_(stream.read(), b'[1, 2, 3]\n[4, 5, 6]\n')
+
+    @raises(Exception)
+    def test_memory_map_is_not_supported(self):
+        self.test_file = 'test.ndjson.gz'
+        pe.save_as(array=self.data, dest_file_name=self.test_file)
+        NDJsonParser('ndjson').parse_file(self.test_file, memory_map=True)
+
+    @raises(FileTypeNotSupported)
+    def test_unknown_inner_type(self):
+        self.test_file = 'test.csv.gz'
+        with gzip.open(self.test_file, 'wb') as f:
+            f.write(b'1,2,3')
+        pe.get_array(file_name=self.test_file)
+
+    def test_other_gz_parser(self):
+        self.test_file = 'test.csv.gz'
+        with gzip.open(self.test_file, 'wb') as f:
+            f.write(b'1,2,3')
+        plugin_info = IOPluginInfo('parser', '%s.CsvGzParser' % __name__,
+                                   file_types=['gz'])
+        PARSER.register_a_plugin(CsvGzParser, plugin_info)
+        try:
+            eq_(pe.get_array(file_name=self.test_file), [['1', '2', '3']])
+        finally:
+            PARSER.registry['gz'].remove(plugin_info)
+
+    def _round_trip(self, file_name):
+        self.test_file = file_name
+        pe.save_as(array=self.data, dest_file_name=file_name)
+        eq_(compression.detect(file_name),
+            file_name.split('.')[-1])
+        eq_(pe.get_array(file_name=file_name), self.data)
+
+    def tearDown(self):
+        if self.test_file and os.path.exists(self.test_file):
+            os.unlink(self.test_file)
+
+
+def _gzip(content):
+    stream = BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode='wb') as f:
+        f.write(content)
+    return stream.getvalue()
@@ -0,0 +1,58 @@
+import json
+import itertools
+
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel.internal import SheetStream
+
+from pyexcel_text.iterrender import iter_render, iter_render_book
+
+
+class TestIterRender:
+    def setUp(self):
+        self.sheet = pe.Sheet([['a', 'b'], [1, 2.5], [3, 'x']],
+                              name='test', name_columns_by_row=0)
+
+    def test_same_as_renderers(self):
+        for file_type in ['grid', 'rst', 'html', 'latex', 'json', 'ndjson']:
+            expected = self.sheet.save_to_memory(file_type,
+                                                 streaming=True).getvalue()
+            eq_(''.join(iter_render(self.sheet, file_type)), expected)
+
+    def test_lines(self):
+        chunks = list(iter_render(self.sheet, 'simple', write_title=False))
+        eq_(chunks, ['  a  b', '\n---  ---', '\n  1  2.5', '\n  3  x'])
+
+    def test_stop_early(self):
+        read = []
+
+        def rows():
+            for index in range(1000):
+                read.append(index)
+                yield [index, 'row %d' % index]
+
+        for file_type in ['plain', 'json', 'ndjson']:
+            del read[:]
+            sheet = SheetStream('test', rows())
+            chunks = iter_render(sheet, file_type, sample_rows=10)
+            list(itertools.islice(chunks, 5))
+            assert len(read) < 20
+
+    @raises(Exception)
+    def test_unknown_file_type(self):
+        iter_render(self.sheet, 'xlsx')
+
+
+def test_book():
+    book = pe.get_book(bookdict={'a': [[1, 2]], 'b': [[3, 4]]})
+    for file_type in ['grid', 'json', 'ndjson']:
+        eq_(''.join(iter_render_book(book, file_type)),
+            book.save_to_memory(file_type).getvalue())
+
+
+def test_json_book_comes_row_by_row():
+    book = pe.get_book(bookdict={'b': [[1, u'é'], [2.5, None]],
+                                 'a': [[]]})
+    chunks = list(iter_render_book(book, 'json'))
+    eq_(''.join(chunks), json.dumps(book.to_dict(), sort_keys=True))
+    eq_(chunks[:3], ['{', '"a": ', '['])
@@ -0,0 +1,87 @@
+import os
+import datetime
+from unittest import SkipTest
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel_text.jsonr import _serializer
+from pyexcel_text.jsonbackend import (
+    get_backend, BACKEND_ENV, STDLIB, ORJSON, UJSON, RAPIDJSON)
+
+
+def test_default_writer_is_stdlib():
+    eq_(get_backend(default=STDLIB).name, STDLIB)
+
+
+def test_default_reader_is_stdlib():
+    eq_(get_backend().name, STDLIB)
+
+
+def test_environment_variable():
+    os.environ[BACKEND_ENV] = STDLIB
+    try:
+        eq_(get_backend().name, STDLIB)
+    finally:
+        del os.environ[BACKEND_ENV]
+
+
+@raises(Exception)
+def test_unknown_backend():
+    get_backend('unknown')
+
+
+class TestFastBackends:
+
+    def test_orjson(self):
+        self._check(ORJSON)
+
+    def test_ujson(self):
+        self._check(UJSON)
+
+    def test_rapidjson(self):
+        self._check(RAPIDJSON)
+
+    def _check(self, name):
+        try:
+            backend = get_backend(name)
+        except ImportError:
+            raise SkipTest("%s is not installed" % name)
+        value = {'b': [1, 2.5, None], 'a': datetime.date(2017, 1, 2),
+                 1: datetime.datetime(2017, 1, 2, 3, 4, 5)}
+        eq_(backend.dumps(value, default=_serializer),
+            '{"1":"2017-01-02 03:04:05.000000","a":"2017-01-02",'
+            '"b":[1,2.5,null]}')
+        eq_(backend.loads('[1, "a", {"b": null}]'), [1, "a", {"b": None}])
+        # what the backend rejects is handed to the json module
+        eq_(str(backend.loads('[NaN]')), '[nan]')
+        eq_(backend.dumps([2 ** 70]), '[%d]' % 2 ** 70)
+        eq_(backend.loads('[%d, 1]' % 2 ** 70), [2 ** 70, 1])
+        eq_(backend.loads('[-%d]' % 2 ** 70), [-2 ** 70])
+        eq_(backend.loads(('[%d]' % 2 ** 70).encode('ascii')), [2 ** 70])
+        sheet = pe.Sheet([[1, 2]])
+        eq_(sheet.get_json(json_backend=name), '{"pyexcel sheet":[[1,2]]}')
+
+
+class TestLoadsLines:
+
+    def setUp(self):
+        self.backend = get_backend(STDLIB)
+
+    def test_batch(self):
+        lines = ['[1, 2]\n', '{"a": null}\n', '"text"', '3.5']
+        eq_(self.backend.loads_lines(lines),
+            [[1, 2], {'a': None}, 'text', 3.5])
+
+    def test_empty(self):
+        eq_(self.backend.loads_lines([]), [])
+
+    @raises(ValueError)
+    def test_two_values_on_a_line(self):
+        # it would pass as two items of the batch
+        self.backend.loads_lines(['1, 2', '3'])
+
+    @raises(ValueError)
+    def test_bad_line(self):
+        self.backend.loads_lines(['[1]', '[2', '[3]'])
+
+    def test_bytes(self):
+        eq_(self.backend.loads_lines([b'[1]', b'[2]']), [[1], [2]])
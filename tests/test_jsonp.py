@@ -1,7 +1,9 @@
 import os
 from nose.tools import eq_, raises
-from pyexcel._compact import StringIO
+import pyexcel as pe
+from pyexcel._compact import StringIO, BytesIO
 from pyexcel_text.jsonp import JsonParser
+from pyexcel_text.jsonstream import load, JsonStream
 
 
 class TestStructure:
@@ -74,6 +76,12 @@ class TestMedia:
                                               sheet_name='test')
         self._verify()
 
+    def test_file_on_demand(self):
+        self.content = self.parser.parse_file(get_file("array.json"),
+                                              on_demand=True,
+                                              sheet_name='test')
+        self._verify()
+
     def test_stream(self):
         with open(get_file("array.json"), 'r') as f:
             file_stream = StringIO(f.read())
@@ -94,5 +102,136 @@ class TestMedia:
         eq_(self.content, {'test': [[1, 2, 3]]})
 
 
+class TestColumns:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+
+    def test_records(self):
+        content = self.parser.parse_file_stream(
+            StringIO('[{"a": 1, "b": 2, "c": 3}, {"a": 4, "b": 5}]'),
+            sheet_name='test', columns=['c', 'a'])
+        eq_(list(content['test']), [['c', 'a'], [3, 1], ['', 4]])
+
+    def test_array(self):
+        content = self.parser.parse_file_stream(
+            StringIO('[[1, 2, 3], [4, 5, 6]]'), sheet_name='test',
+            columns=[1])
+        eq_(list(content['test']), [[2], [5]])
+
+    def test_book(self):
+        content = self.parser.parse_file_content(
+            '{"a": [[1, 2]], "b": [[3, 4]]}', columns=[1])
+        eq_(dict((name, list(rows)) for name, rows in content.items()),
+            {'a': [[2]], 'b': [[4]]})
+
+
+class TestLazyBook:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+        self.content = ('{"a": [[1, "]"], [2, {"x": "[\\""}]], '
+                        '"b": [[3, 4]], "c": []}')
+
+    def test_sheet_name(self):
+        sheets = self.parser.parse_file_stream(StringIO(self.content),
+                                               sheet_name='b')
+        eq_(list(sheets.keys()), ['b'])
+        eq_(list(sheets['b']), [[3, 4]])
+
+    def test_sheet_index(self):
+        sheets = self.parser.parse_file_content(self.content, sheet_index=1)
+        eq_(list(sheets['b']), [[3, 4]])
+
+    def test_first_sheet(self):
+        sheets = self.parser.parse_file_content(self.content, sheet_index=0)
+        eq_(list(sheets['a']), [[1, ']'], [2, {'x': '["'}]])
+
+    def test_empty_sheet(self):
+        sheets = self.parser.parse_file_content(self.content, sheet_index=2)
+        eq_(sheets, {'c': []})
+
+    @raises(IndexError)
+    def test_sheet_index_out_of_bound(self):
+        self.parser.parse_file_content(self.content, sheet_index=3)
+
+    def test_unknown_name_reads_the_book(self):
+        sheets = self.parser.parse_file_content(self.content,
+                                                sheet_name='d')
+        eq_(sorted(sheets.keys()), ['a', 'b', 'c'])
+
+    @raises(ValueError)
+    def test_unknown_name_in_a_stream_that_cannot_go_back(self):
+        self.parser.parse_file_stream(OneWayStream(self.content),
+                                      sheet_name='d')
+
+    def test_not_a_book(self):
+        sheets = self.parser.parse_file_content('{"a": [1, 2], "b": [3]}',
+                                                sheet_name='test')
+        eq_(list(sheets['test']), [['a', 'b'], [1, 3], [2]])
+
+    def test_get_sheet(self):
+        sheet = pe.get_sheet(file_name=get_file("bookdict.json"),
+                             sheet_name='sheet 2')
+        eq_(sheet.name, 'sheet 2')
+        eq_(sheet.to_array(), [[1, 2], [3, 4]])
+
+
+class OneWayStream(object):
+
+    def __init__(self, content):
+        self._stream = StringIO(content)
+
+    def read(self, size):
+        return self._stream.read(size)
+
+
+class TestJsonStream:
+
+    def test_small_chunks(self):
+        content = '[{"a": 12345, "b": "x,y]"},\n {"a": -1.5e3, "b": null}]'
+        rows = load(StringIO(content), chunk_size=2)
+        eq_(list(rows), [{"a": 12345, "b": "x,y]"}, {"a": -1500.0, "b": None}])
+
+    def test_bytes_stream(self):
+        content = u'[["\u00e9t\u00e9", 1]]'.encode('utf-8')
+        rows = load(BytesIO(content), chunk_size=1)
+        eq_(list(rows), [[u'\u00e9t\u00e9', 1]])
+
+    def test_empty_array(self):
+        eq_(list(load(StringIO(' [ ] '))), [])
+
+    def test_object(self):
+        eq_(load(StringIO('{"a": [1]}'), chunk_size=2), {"a": [1]})
+
+    @raises(ValueError)
+    def test_missing_separator(self):
+        list(load(StringIO('[[1] [2]]')))
+
+    @raises(ValueError)
+    def test_truncated(self):
+        list(load(StringIO('[[1], [2'), chunk_size=2))
+
+    def test_number_across_chunks(self):
+        eq_(list(load(StringIO('[12.5e-1, 3]'), chunk_size=3)), [1.25, 3])
+
+    def test_skip_values(self):
+        content = ('{"a": [[1, "]\\\"["], {"b": [{}]}], "c": "}", '
+                   '"d": 7, "e": [2]}')
+        json_stream = JsonStream(StringIO(content), chunk_size=3)
+        values = {}
+        for key in json_stream.iter_members():
+            if key in ('a', 'c'):
+                json_stream.skip_value()
+            else:
+                values[key] = json_stream.decode_value()
+        eq_(values, {'d': 7, 'e': [2]})
+
+    @raises(ValueError)
+    def test_skip_truncated(self):
+        json_stream = JsonStream(StringIO('[[1], ["2'), chunk_size=2)
+        json_stream.skip_value()
+
+
 def get_file(file_name):
     return os.path.join("tests", "fixtures", file_name)
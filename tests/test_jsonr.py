@@ -0,0 +1,53 @@
+import uuid
+import decimal
+import datetime
+from nose.tools import eq_
+import pyexcel as pe
+from pyexcel_text.jsonr import Serializer, _serializer
+
+
+class FakeInt64(object):
+    __module__ = 'numpy'
+
+    def item(self):
+        return 7
+
+
+class Moment(datetime.datetime):
+    pass
+
+
+class TestSerializer:
+
+    def test_defaults(self):
+        eq_(_serializer(datetime.datetime(2017, 1, 2, 3, 4, 5)),
+            '2017-01-02 03:04:05.000000')
+        eq_(_serializer(datetime.date(2017, 1, 2)), '2017-01-02')
+        eq_(_serializer(datetime.date(999, 1, 2)),
+            datetime.date(999, 1, 2).strftime('%Y-%m-%d'))
+        eq_(_serializer(datetime.time(3, 4, 5, 6)), '03:04:05.000006')
+        eq_(_serializer(decimal.Decimal('1.10')), '1.10')
+        eq_(_serializer(uuid.UUID(int=1)),
+            '00000000-0000-0000-0000-000000000001')
+
+    def test_numpy_scalar(self):
+        eq_(Serializer()(FakeInt64()), 7)
+
+    def test_subclass(self):
+        eq_(Serializer()(Moment(2017, 1, 2)), '2017-01-02 00:00:00.000000')
+
+    def test_formats(self):
+        serializer = Serializer(date_format='%d/%m/%Y',
+                                datetime_format='%Y%m%dT%H%M')
+        eq_(serializer(datetime.date(2017, 1, 2)), '02/01/2017')
+        eq_(serializer(datetime.datetime(2017, 1, 2, 3, 4)),
+            '20170102T0304')
+
+    def test_renderers(self):
+        sheet = pe.Sheet([[datetime.date(2017, 1, 2),
+                           datetime.datetime(2017, 1, 2, 3, 4)]])
+        eq_(sheet.get_json(write_title=False, date_format='%d/%m/%Y',
+                           datetime_format='%H:%M'),
+            '[["02/01/2017", "03:04"]]')
+        eq_(sheet.get_ndjson(date_format='%Y'), '["2017", '
+            '"2017-01-02 03:04:00.000000"]\n')
@@ -0,0 +1,106 @@
+import os
+from nose.tools import eq_
+import pyexcel as pe
+from pyexcel.constants import DEFAULT_NAME
+from pyexcel._compact import StringIO
+from pyexcel_text.jsonp import JsonParser
+from pyexcel_text.ndjsonp import NDJsonParser
+from pyexcel_text.metrics import Metrics
+
+
+class TestParsers:
+
+    def setUp(self):
+        self.reports = []
+        self.metrics = Metrics(callback=self.reports.append)
+
+    def test_ndjson(self):
+        content = '{"a": 1, "b": 2}\n{"a": 3, "b": 4}\n'
+        sheets = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(content), sheet_name='test', metrics=self.metrics)
+        eq_(list(sheets['test']), [['a', 'b'], [1, 2], [3, 4]])
+        self._verify(len(content), 3)
+
+    def test_ndjson_memory_map(self):
+        sheets = NDJsonParser('ndjson').parse_file(
+            get_file('records.ndjson'), sheet_name='test', memory_map=True,
+            metrics=self.metrics)
+        self._verify(os.path.getsize(get_file('records.ndjson')),
+                     len(sheets['test']))
+
+    def test_bytes_of_text(self):
+        content = u'["\u00e9t\u00e9", "\u4e2d"]\n'
+        sheets = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(content), sheet_name='test', metrics=self.metrics)
+        eq_(list(sheets['test']), [[u'\u00e9t\u00e9', u'\u4e2d']])
+        self._verify(len(content.encode('utf-8')), 1)
+
+    def test_json(self):
+        content = '[[1, 2], [3, 4]]'
+        sheets = JsonParser('json').parse_file_stream(
+            StringIO(content), sheet_name='test', metrics=self.metrics)
+        eq_(list(sheets['test']), [[1, 2], [3, 4]])
+        self._verify(len(content), 2)
+
+    def test_json_content(self):
+        content = '{"a": [1, 2]}'
+        sheets = JsonParser('json').parse_file_content(
+            content, metrics=self.metrics)
+        eq_(list(sheets[DEFAULT_NAME]), [['a'], [1], [2]])
+        self._verify(len(content), 3)
+
+    def test_a_sheet_of_book(self):
+        content = '{"a": [[1]], "b": [[2], [3]]}'
+        sheets = JsonParser('json').parse_file_stream(
+            StringIO(content), sheet_name='b', metrics=self.metrics)
+        eq_(list(sheets['b']), [[2], [3]])
+        self._verify(len(content), 2)
+
+    def test_get_sheet(self):
+        pe.get_sheet(file_name=get_file('array.json'), metrics=self.metrics)
+        self._verify(os.path.getsize(get_file('array.json')), 1)
+
+    def _verify(self, bytes_read, rows):
+        eq_(self.metrics.bytes_read, bytes_read)
+        eq_(self.metrics.rows_decoded, rows)
+        eq_(self.reports, [self.metrics])
+        assert self.metrics.decode_seconds > 0
+        assert self.metrics.conversion_seconds >= 0
+        eq_(self.metrics.bytes_written, 0)
+
+
+class TestRenderers:
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.sheet = pe.Sheet([[1, 2], [3, 4]])
+
+    def test_sheet(self):
+        for file_type in ['json', 'ndjson', 'grid', 'html', 'latex']:
+            metrics = Metrics()
+            content = self.sheet.save_to_memory(file_type, metrics=metrics)
+            eq_(metrics.bytes_written, len(content.getvalue()))
+            assert metrics.render_seconds > 0
+
+    def test_book(self):
+        book = pe.Book({'a': [[1]], 'b': [[2]]})
+        content = book.save_to_memory('json', metrics=self.metrics)
+        eq_(self.metrics.bytes_written, len(content.getvalue()))
+        eq_(sorted(self.metrics.as_dict().keys()),
+            ['bytes_read', 'bytes_written', 'conversion_seconds',
+             'decode_seconds', 'render_seconds', 'rows_decoded'])
+
+    def test_bytes_of_text(self):
+        sheet = pe.Sheet([[u'\u00e9t\u00e9']])
+        content = sheet.save_to_memory('plain', metrics=self.metrics)
+        eq_(content.getvalue(), u'pyexcel sheet:\n\u00e9t\u00e9')
+        eq_(self.metrics.bytes_written, len(u'pyexcel sheet:\n') + 5)
+
+    def test_save_as(self):
+        stream = pe.save_as(array=[[1, 2]], dest_file_type='ndjson',
+                            dest_metrics=self.metrics)
+        eq_(self.metrics.bytes_written, len(stream.getvalue()))
+
+
+def get_file(file_name):
+    return os.path.join("tests", "fixtures", file_name)
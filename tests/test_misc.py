@@ -1,6 +1,7 @@
 from nose.tools import eq_
 import pyexcel as p
 from textwrap import dedent
+import datetime
 
 
 def test_sheet_stream():
@@ -17,3 +18,19 @@ def test_sheet_stream():
 def test_simple_sheet():
     sheet = p.Sheet([[1, 2]])
     eq_(sheet.json, '{"pyexcel sheet": [[1, 2]]}')
+
+
+def test_sheet_stream_to_json():
+    def data():
+        yield [1, 2]
+        yield [datetime.date(2017, 1, 2), u'x']
+    stream = p.isave_as(array=data(), dest_file_type='json')
+    eq_(stream.getvalue(),
+        '{"pyexcel_sheet1": [[1, 2], ["2017-01-02", "x"]]}')
+
+
+def test_data_frame_to_json():
+    sheet = p.Sheet([['', 'b', 'a'], ['r2', 1, 2], ['r1', 3, 4]],
+                    name_columns_by_row=0, name_rows_by_column=0)
+    eq_(sheet.get_json(write_title=False),
+        '{"r1": {"a": 4, "b": 3}, "r2": {"a": 2, "b": 1}}')
@@ -1,8 +1,11 @@
 import os
-from nose.tools import eq_, raises
+from nose.tools import eq_, ok_, raises
 from pyexcel._compact import StringIO
 from pyexcel_text.ndjsonp import NDJsonParser as JsonParser
 from pyexcel_text.ndjsonp import ARRAY, RECORDS, DICT, AUTO_DETECT
+from pyexcel_text.ndjsonp import ErrorReport
+from pyexcel_text.parallel import byte_ranges, parallel_json_loads
+from pyexcel_text.lineindex import LineIndex
 
 
 class TestStructure:
@@ -145,5 +148,324 @@ class TestMedia:
         eq_(self.content, {'test': [[1, 2, 3]]})
 
 
+class TestBatchSize:
+
+    def setUp(self):
+        self.parser = JsonParser("ndjson")
+        self.lines = ['[%d, "%d"]\n' % (index, index) for index in range(25)]
+
+    def test_batches(self):
+        for batch_size in [1, 2, 7, 25, 1000]:
+            content = self.parser.parse_file_stream(
+                StringIO(''.join(self.lines)), struct=ARRAY,
+                sheet_name='test', batch_size=batch_size)
+            eq_(list(content['test']),
+                [[index, str(index)] for index in range(25)])
+
+    @raises(ValueError)
+    def test_bad_line_in_a_batch(self):
+        self.lines[12] = '[12, \n'
+        content = self.parser.parse_file_stream(
+            StringIO(''.join(self.lines)), struct=ARRAY, sheet_name='test',
+            batch_size=10)
+        list(content['test'])
+
+
+class TestColumns:
+
+    def setUp(self):
+        self.parser = JsonParser("ndjson")
+
+    def test_records(self):
+        content = self.parser.parse_file_stream(
+            StringIO('{"a": 1, "b": 2, "c": 3}\n{"a": 4, "c": 6}\n'),
+            sheet_name='test', columns=['c', 'a'])
+        eq_(list(content['test']), [['c', 'a'], [3, 1], [6, 4]])
+
+    def test_records_with_memory_map(self):
+        content = self.parser.parse_file(
+            get_file("records.ndjson"), sheet_name='test', memory_map=True,
+            columns=['b'])
+        eq_(content['test'][0], ['b'])
+
+    def test_array(self):
+        content = self.parser.parse_file_stream(
+            StringIO('[1, 2, 3]\n[4]\n'), sheet_name='test',
+            columns=[2, 0])
+        eq_(list(content['test']), [[3, 1], ['', 4]])
+
+    def test_dict(self):
+        content = self.parser.parse_file_stream(
+            StringIO('{"a": [1, 2]}\n{"b": [3, 4]}\n'), sheet_name='test',
+            struct=DICT, columns=[0, 2])
+        eq_(list(content['test']), [['a', 2], ['b', 4]])
+
+    @raises(TypeError)
+    def test_array_by_name(self):
+        content = self.parser.parse_file_stream(
+            StringIO('[1, 2, 3]\n'), sheet_name='test', columns=['a'])
+        list(content['test'])
+
+
+class TestSkipLines:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+
+    def test_row_limit_stops_reading(self):
+        lines = iter(['[1]\n', '[2]\n', 'not json\n', '[4]\n'])
+        content = self.parser.parse_file_stream(lines, row_limit=2,
+                                                sheet_name='test')
+        eq_(list(content['test']), [[1], [2]])
+        eq_(next(lines), '[4]\n')
+
+    def test_start_row_skips_decoding(self):
+        lines = ['[1]\n', 'not json\n', '[3]\n']
+        content = self.parser.parse_file_stream(lines, start_row=2,
+                                                struct=ARRAY,
+                                                sheet_name='test')
+        eq_(list(content['test']), [[3]])
+
+    def test_records_window(self):
+        lines = ['{"a": 1, "b": 2}\n', 'not json\n', '{"a": 3, "b": 4}\n',
+                 '{"a": 5, "b": 6}\n']
+        content = self.parser.parse_file_stream(lines, start_row=3,
+                                                row_limit=1,
+                                                sheet_name='test')
+        eq_(list(content['test']), [[3, 4]])
+
+    def test_records_head(self):
+        lines = ['{"a": 1, "b": 2}\n', '{"a": 3, "b": 4}\n', 'not json\n']
+        content = self.parser.parse_file_stream(lines, row_limit=3,
+                                                struct=RECORDS,
+                                                sheet_name='test')
+        eq_(list(content['test']), [['a', 'b'], [1, 2], [3, 4]])
+
+    def test_records_keys_only(self):
+        lines = ['{"a": 1, "b": 2}\n', '{"a": 3, "b": 4}\n']
+        for batch_size in [1, 1000]:
+            content = self.parser.parse_file_stream(
+                lines, row_limit=1, batch_size=batch_size,
+                sheet_name='test')
+            eq_(list(content['test']), [['a', 'b']])
+
+    def test_skip_row_func(self):
+        def even_rows_only(index, start, limit):
+            return -1 if index % 2 else 0
+        lines = ['[0]\n', 'not json\n', '[2]\n']
+        content = self.parser.parse_file_stream(
+            lines, skip_row_func=even_rows_only, sheet_name='test')
+        eq_(list(content['test']), [[0], [2]])
+
+    def test_flat_dict_rows_are_not_lines(self):
+        lines = ['{"a": 1}\n', '{"b": 2, "c": 3}\n', '{"d": 4}\n',
+                 '{"e": 5}\n']
+        content = self.parser.parse_file_stream(lines, struct=DICT,
+                                                start_row=2,
+                                                sheet_name='test')
+        eq_(list(content['test']), [['c', 3], ['d', 4], ['e', 5]])
+        content = self.parser.parse_file_stream(lines, struct=DICT,
+                                                row_limit=2,
+                                                sheet_name='test')
+        eq_(list(content['test']), [['a', 1], ['b', 2]])
+
+
+class TestErrorTolerance:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+        self.expected = {'test': [[1, 2], [3, 4], [5, 6]]}
+
+    def test_skip(self):
+        content = self.parser.parse_file(get_file("partly_bad.ndjson"),
+                                         on_error='skip', sheet_name='test')
+        eq_(content, self.expected)
+        report = self.parser.error_report
+        eq_(report.lines_read, 5)
+        eq_(report.bad_lines, 2)
+        eq_(report.errors, [])
+
+    def test_collect(self):
+        report = ErrorReport()
+        content = self.parser.parse_file(get_file("partly_bad.ndjson"),
+                                         on_error='collect',
+                                         error_report=report,
+                                         sheet_name='test')
+        eq_(content, self.expected)
+        eq_([error[:2] for error in report.errors], [(2, 7), (4, 19)])
+
+    def test_collect_with_memory_map(self):
+        report = ErrorReport()
+        content = self.parser.parse_file(get_file("partly_bad.ndjson"),
+                                         on_error='collect',
+                                         error_report=report,
+                                         memory_map=True,
+                                         sheet_name='test')
+        eq_(content, self.expected)
+        eq_([error[:2] for error in report.errors], [(2, 7), (4, 19)])
+
+    def test_rows_are_counted_after_bad_lines(self):
+        for memory_map in [False, True]:
+            content = self.parser.parse_file(
+                get_file("partly_bad.ndjson"), on_error='skip',
+                memory_map=memory_map, start_row=2, sheet_name='test')
+            eq_(content, {'test': [[5, 6]]})
+            content = self.parser.parse_file(
+                get_file("partly_bad.ndjson"), on_error='collect',
+                memory_map=memory_map, start_row=1, row_limit=1,
+                sheet_name='test')
+            eq_(content, {'test': [[3, 4]]})
+
+    def test_bad_first_line(self):
+        content = self.parser.parse_file_content(
+            'oops\n{"a": 1, "b": 2}\n', on_error='skip', sheet_name='test')
+        eq_(list(content['test']), [['a', 'b'], [1, 2]])
+
+    @raises(ValueError)
+    def test_raise(self):
+        self.parser.parse_file(get_file("partly_bad.ndjson"),
+                               on_error='raise')
+
+    @raises(Exception)
+    def test_unknown_on_error(self):
+        self.parser.parse_file(get_file("array.ndjson"), on_error='ignore')
+
+
+class TestParallel:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+        self.test_file = 'test_parallel.ndjson'
+        with open(self.test_file, 'w') as f:
+            for index in range(100):
+                f.write('{"a": %d, "b": "%s"}\n' % (index, 'x' * index))
+
+    def test_byte_ranges(self):
+        ranges = list(byte_ranges(self.test_file, 500))
+        ok_(len(ranges) > 7)
+        eq_(ranges[0][0], 0)
+        eq_(ranges[-1][1], os.path.getsize(self.test_file))
+        with open(self.test_file, 'rb') as f:
+            content = f.read()
+        for start, end in ranges:
+            eq_(content[end - 1:end], b'\n')
+
+    def test_ordered(self):
+        content = self.parser.parse_file(self.test_file, workers=2,
+                                         sheet_name='test')
+        eq_(content['test'], self._expected())
+
+    def test_unordered(self):
+        content = self.parser.parse_file(self.test_file, workers=2,
+                                         ordered=False, on_demand=True,
+                                         struct=RECORDS, sheet_name='test')
+        rows = list(content['test'])
+        eq_(rows[0], ['a', 'b'])
+        eq_(sorted(rows[1:]), self._expected()[1:])
+
+    def test_small_ranges(self):
+        for ordered in [True, False]:
+            rows = list(parallel_json_loads(self.test_file, 2,
+                                            ordered=ordered,
+                                            range_size=100))
+            if not ordered:
+                rows.sort(key=lambda row: row['a'])
+            eq_(rows, [{"a": index, "b": 'x' * index}
+                       for index in range(100)])
+
+    @raises(ValueError)
+    def test_bad_json_format(self):
+        self.parser.parse_file(get_file("bad.ndjson"), workers=2)
+
+    @raises(ValueError)
+    def test_bad_json_in_a_later_range(self):
+        with open(self.test_file, 'a') as f:
+            f.write('{"a": \n')
+        list(parallel_json_loads(self.test_file, 2, range_size=100))
+
+    def _expected(self):
+        # the empty string in the first row is trimmed by the reader
+        return [['a', 'b'], [0]] + [[index, 'x' * index]
+                                    for index in range(1, 100)]
+
+    def tearDown(self):
+        os.unlink(self.test_file)
+
+
+class TestMemoryMap:
+
+    def setUp(self):
+        self.parser = JsonParser("json")
+        self.test_file = 'test_memory_map.ndjson'
+        self.index_file = self.test_file + '.idx'
+        with open(self.test_file, 'w') as f:
+            for index in range(1, 21):
+                f.write('{"a": %d, "b": %d}\n' % (index, -index))
+
+    def test_records_window(self):
+        content = self.parser.parse_file(self.test_file, memory_map=True,
+                                         start_row=5, row_limit=3,
+                                         sheet_name='test')
+        eq_(list(content['test']), [[5, -5], [6, -6], [7, -7]])
+
+    def test_records_head(self):
+        content = self.parser.parse_file(self.test_file, memory_map=True,
+                                         row_limit=3,
+                                         sheet_name='test')
+        eq_(list(content['test']), [['a', 'b'], [1, -1], [2, -2]])
+
+    def test_records_keys_only(self):
+        content = self.parser.parse_file(self.test_file, memory_map=True,
+                                         row_limit=1, sheet_name='test')
+        eq_(content, {'test': [['a', 'b']]})
+
+    def test_array_window(self):
+        content = self.parser.parse_file(get_file('array.ndjson'),
+                                         memory_map=True, start_row=0,
+                                         row_limit=1, sheet_name='test')
+        eq_(content, {'test': [[1, 2, 3]]})
+
+    def test_flat_dict_window(self):
+        with open(self.test_file, 'w') as f:
+            f.write('{"a": 1}\n{"b": 2, "c": 3}\n{"d": 4}\n{"e": 5}\n')
+        content = self.parser.parse_file(self.test_file, memory_map=True,
+                                         struct=DICT, start_row=2,
+                                         row_limit=2, sheet_name='test')
+        eq_(content, {'test': [['c', 3], ['d', 4]]})
+
+    def test_skip_row_func(self):
+        def skip_odd(index, start, limit):
+            return -1 if index % 2 else 0
+        content = self.parser.parse_file(self.test_file, memory_map=True,
+                                         skip_row_func=skip_odd,
+                                         sheet_name='test')
+        eq_(list(content['test'])[:3], [['a', 'b'], [2, -2], [4, -4]])
+
+    def test_index_file(self):
+        content = self.parser.parse_file(self.test_file, index_file=True,
+                                         start_row=20, on_demand=True,
+                                         sheet_name='test')
+        eq_(list(content['test']), [[20, -20]])
+        assert os.path.exists(self.index_file)
+        line_index = LineIndex(self.test_file, index_file=True)
+        eq_(line_index.number_of_lines(), 20)
+        eq_(line_index.line(19), '{"a": 20, "b": -20}')
+        line_index.close()
+
+    def test_stale_index_file(self):
+        LineIndex(self.test_file, index_file=True).close()
+        with open(self.test_file, 'a') as f:
+            f.write('{"a": 21, "b": -21}')
+        line_index = LineIndex(self.test_file, index_file=True)
+        eq_(line_index.number_of_lines(), 21)
+        eq_(list(line_index.lines(20)), ['{"a": 21, "b": -21}'])
+        line_index.close()
+
+    def tearDown(self):
+        for file_name in [self.test_file, self.index_file]:
+            if os.path.exists(file_name):
+                os.unlink(file_name)
+
+
 def get_file(file_name):
     return os.path.join("tests", "fixtures", file_name)
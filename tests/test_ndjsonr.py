@@ -0,0 +1,69 @@
+import datetime
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel._compact import StringIO
+from pyexcel_text.ndjsonr import NDJsonifier
+from pyexcel_text.ndjsonp import NDJsonParser, ARRAY, RECORDS, DICT
+
+
+class TestStructure:
+
+    def setUp(self):
+        self.renderer = NDJsonifier('ndjson')
+        self.parser = NDJsonParser('ndjson')
+
+    def test_array(self):
+        sheet = pe.Sheet([[1, 2], [datetime.date(2017, 1, 2), 'x']])
+        self._render(sheet)
+        eq_(self.content, '[1, 2]\n["2017-01-02", "x"]\n')
+
+    def test_records(self):
+        sheet = pe.Sheet([['b', 'a'], [1, 2], [3, 4]],
+                         name_columns_by_row=0)
+        self._render(sheet)
+        eq_(self.content, '{"a": 2, "b": 1}\n{"a": 4, "b": 3}\n')
+        self._verify_round_trip(RECORDS, [['a', 'b'], [2, 1], [4, 3]])
+
+    def test_records_from_plain_sheet(self):
+        sheet = pe.Sheet([['a', 'b'], [1, 2]])
+        self._render(sheet, struct=RECORDS)
+        eq_(self.content, '{"a": 1, "b": 2}\n')
+
+    def test_dict(self):
+        sheet = pe.Sheet([['a', 1], ['b', 2]], name_rows_by_column=0)
+        self._render(sheet)
+        eq_(self.content, '{"a": 1}\n{"b": 2}\n')
+        self._verify_round_trip(DICT, [['a', 1], ['b', 2]])
+
+    def test_dict_of_lists(self):
+        sheet = pe.Sheet([['a', 1, 2], ['b', 3, 4]])
+        self._render(sheet, struct=DICT)
+        eq_(self.content, '{"a": [1, 2]}\n{"b": [3, 4]}\n')
+        self._verify_round_trip(DICT, [['a', 1, 2], ['b', 3, 4]])
+
+    def test_sheet_stream(self):
+        stream = pe.isave_as(array=iter([[1, 2], [3, 4]]),
+                             dest_file_type='ndjson')
+        eq_(stream.getvalue(), '[1, 2]\n[3, 4]\n')
+
+    def test_book(self):
+        book = pe.Book({'a': [[1]], 'b': [[2]]})
+        eq_(book.ndjson, '[1]\n[2]\n')
+
+    @raises(Exception)
+    def test_unknown_struct(self):
+        self._render(pe.Sheet([[1]]), struct='unknown')
+
+    def _render(self, sheet, **keywords):
+        stream = StringIO()
+        self.renderer.render_sheet_to_stream(stream, sheet, **keywords)
+        self.content = stream.getvalue()
+
+    def _verify_round_trip(self, struct, expected):
+        content = self.parser.parse_file_content(
+            self.content, struct=struct, sheet_name='test')
+        eq_(list(content['test']), expected)
+
+    def test_array_round_trip(self):
+        self._render(pe.Sheet([[1, 2], [3, 4]]), struct=ARRAY)
+        self._verify_round_trip(ARRAY, [[1, 2], [3, 4]])
@@ -0,0 +1,56 @@
+from nose.tools import eq_
+from pyexcel._compact import OrderedDict
+from pyexcel.plugins.sources.pydata.common import (
+    RecordsReader as BaseRecordsReader)
+
+from pyexcel_text import records
+from pyexcel_text.records import RecordsReader
+
+
+class TestRecordsReader:
+    def setUp(self):
+        self.records = [
+            {'b': 2, 'a': 1, 'c': ''},
+            {'a': 3, 'c': 4},
+            {'a': 5, 'b': 6, 'c': 7, 'd': 8}
+        ]
+
+    def test_same_as_pyexcel(self):
+        self._compare(self.records)
+
+    def test_ordered_dict(self):
+        record = OrderedDict([('z', 1), ('a', 2)])
+        self._compare([record, {'a': 3, 'z': 4}])
+
+    def test_single_key(self):
+        self._compare([{'a': 1}, {'a': 2}, {'b': 3}])
+
+    def test_custom_headers(self):
+        self._compare(self.records, custom_headers=['c', 'a'])
+
+    def test_start_row_and_row_limit(self):
+        self._compare(self.records, start_row=1, row_limit=1)
+
+    def test_column_limit(self):
+        self._compare(self.records, start_column=1, column_limit=1)
+
+    def test_empty(self):
+        eq_(list(RecordsReader([]).to_array()), [])
+
+    def test_batches(self):
+        batch_size = records.BATCH_SIZE
+        records.BATCH_SIZE = 2
+        try:
+            self._compare(self.records)
+        finally:
+            records.BATCH_SIZE = batch_size
+
+    def test_generator(self):
+        expected = list(BaseRecordsReader(self.records).to_array())
+        actual = list(RecordsReader(iter(self.records)).to_array())
+        eq_(actual, expected)
+
+    def _compare(self, content, **keywords):
+        expected = list(BaseRecordsReader(content, **keywords).to_array())
+        actual = list(RecordsReader(content, **keywords).to_array())
+        eq_([list(row) for row in actual], [list(row) for row in expected])
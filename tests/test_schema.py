@@ -0,0 +1,121 @@
+import datetime
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel._compact import StringIO
+from pyexcel_text.jsonp import JsonParser
+from pyexcel_text.ndjsonp import NDJsonParser
+from pyexcel_text.schema import (
+    Schema, infer_types, INFER, INT, FLOAT, DATE, DATETIME, TIME, TEXT,
+    BOOL, NONE)
+
+
+def test_infer_types():
+    rows = [
+        [1, 1, '2017-01-02', '2017-01-02 03:04:05.000060', '03:04:05', 'a'],
+        [2, 2.5, None, '2017-01-02T03:04:05', '', 1],
+        [3, '', '2017-01-03', '2017-01-03', '03:04:05.5', True]
+    ]
+    eq_(infer_types(rows), [INT, FLOAT, DATE, DATETIME, TIME, TEXT])
+
+
+def test_infer_types_of_ragged_rows():
+    eq_(infer_types([[True], [None, 1]]), [BOOL, INT])
+    eq_(infer_types([[None]]), [NONE])
+
+
+class TestSchema:
+
+    def test_infer(self):
+        schema = Schema()
+        rows = list(schema.apply([
+            [1, '2017-01-02', '2017-01-02 03:04:05.000060', '03:04:05.5'],
+            [2.5, '', '2017-01-03', None],
+            [3, 'n/a']
+        ]))
+        eq_(schema.types, [FLOAT, TEXT, DATETIME, TIME])
+        eq_(rows, [
+            [1.0, '2017-01-02', datetime.datetime(2017, 1, 2, 3, 4, 5, 60),
+             datetime.time(3, 4, 5, 500000)],
+            [2.5, '', datetime.datetime(2017, 1, 3), None],
+            [3.0, 'n/a']
+        ])
+
+    def test_header(self):
+        rows = list(Schema().apply([['a', 'b'], ['2017-01-02', 1]],
+                                   header=True))
+        eq_(rows, [['a', 'b'], [datetime.date(2017, 1, 2), 1]])
+
+    def test_sample_rows(self):
+        schema = Schema(sample_rows=1)
+        rows = list(schema.apply([['2017-01-02'], ['text']]))
+        eq_(schema.types, [DATE])
+        # what does not convert is left as it is
+        eq_(rows, [[datetime.date(2017, 1, 2)], ['text']])
+
+    def test_given_types(self):
+        rows = list(Schema([INT, FLOAT, TEXT]).apply([['1', '2', 3],
+                                                      [1.5, 2, 3]]))
+        eq_(rows, [[1, 2.0, 3], [1.5, 2.0, 3]])
+
+    def test_given_types_by_name(self):
+        schema = Schema({'b': DATE, 0: INT})
+        rows = list(schema.apply([['a', 'b'], ['1', '2017-01-02']],
+                                 header=True))
+        eq_(schema.types, [INT, DATE])
+        eq_(rows, [['a', 'b'], [1, datetime.date(2017, 1, 2)]])
+
+    @raises(KeyError)
+    def test_unknown_name(self):
+        list(Schema({'c': DATE}).apply([['a', 'b'], [1, 2]], header=True))
+
+
+class TestParsers:
+
+    def setUp(self):
+        sheet = pe.Sheet([
+            ['a', 'b', 'c'],
+            [1, datetime.date(2017, 1, 2),
+             datetime.datetime(2017, 1, 2, 3, 4, 5, 60)],
+            [2.5, '', datetime.datetime(2017, 1, 3)]
+        ], name_columns_by_row=0)
+        self.ndjson = sheet.get_ndjson()
+        self.json = sheet.get_json(write_title=False)
+        self.expected = [
+            ['a', 'b', 'c'],
+            [1.0, datetime.date(2017, 1, 2),
+             datetime.datetime(2017, 1, 2, 3, 4, 5, 60)],
+            [2.5, '', datetime.datetime(2017, 1, 3)]
+        ]
+
+    def test_ndjson_round_trip(self):
+        content = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(self.ndjson), sheet_name='test', schema=INFER)
+        eq_(list(content['test']), self.expected)
+
+    def test_json_round_trip(self):
+        content = JsonParser('json').parse_file_stream(
+            StringIO(self.json), sheet_name='test', schema=INFER)
+        eq_(list(content['test']), self.expected)
+
+    def test_without_schema(self):
+        content = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(self.ndjson), sheet_name='test')
+        eq_(list(content['test'])[1][1], '2017-01-02')
+
+    def test_records_without_keys(self):
+        content = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(self.ndjson), sheet_name='test', schema=INFER,
+            start_row=1)
+        eq_(list(content['test']), self.expected[1:])
+
+    def test_schema_types_can_be_read_back(self):
+        schema = Schema()
+        content = NDJsonParser('ndjson').parse_file_stream(
+            StringIO(self.ndjson), sheet_name='test', schema=schema)
+        list(content['test'])
+        eq_(schema.types, [FLOAT, DATE, DATETIME])
+
+    def test_get_sheet(self):
+        sheet = pe.get_sheet(file_type='ndjson', file_content=self.ndjson,
+                             schema=INFER)
+        eq_(sheet.to_array(), self.expected)
@@ -0,0 +1,375 @@
+import datetime
+from textwrap import dedent
+
+import tabulate
+from nose.tools import eq_, raises
+import pyexcel as pe
+from pyexcel._compact import StringIO
+
+from pyexcel_text import tables
+from pyexcel_text.tables import (
+    TableWriter, HtmlWriter, LayoutCache, TRUNCATE, OVERFLOW)
+
+FORMATS = ['simple', 'plain', 'grid', 'pipe', 'orgtbl', 'rst']
+
+
+class TestTableWriter:
+    def setUp(self):
+        self.rows = [
+            ['', 1, 1.5, 'abc', None, True],
+            [' pad ', -23, 1e20, '12', 2.25, False],
+            ['x', 0, 'nan', b'xy', '3.125', 'True'],
+            [datetime.date(2017, 1, 1), 10 ** 20, 1.5e-7, 'a b', None, None]
+        ]
+
+    def test_same_as_tabulate(self):
+        for tablefmt in FORMATS:
+            expected = tabulate.tabulate(self.rows, tablefmt=tablefmt)
+            eq_(self._write(tablefmt, self.rows), expected)
+
+    def test_same_as_tabulate_with_headers(self):
+        headers = ['', 'number', 'b', 'text', 'c', 'flag']
+        for tablefmt in FORMATS:
+            expected = tabulate.tabulate(self.rows, tablefmt=tablefmt,
+                                         headers=headers)
+            eq_(self._write(tablefmt, self.rows, headers=headers),
+                expected)
+
+    def test_render_same_as_tabulate(self):
+        headers = ['', 'number', 'b', 'text', 'c', 'flag']
+        for tablefmt in FORMATS:
+            writer = TableWriter(tablefmt)
+            eq_(writer.render(self.rows),
+                tabulate.tabulate(self.rows, tablefmt=tablefmt))
+            eq_(writer.render(self.rows, headers=headers),
+                tabulate.tabulate(self.rows, tablefmt=tablefmt,
+                                  headers=headers))
+
+    def test_render_leaves_wide_characters_to_tabulate(self):
+        writer = TableWriter('simple')
+        eq_(writer.render([[u'\u4e2d\u6587', 1]]), None)
+        eq_(writer.render([['a\nb', 1]]), None)
+        eq_(writer.render([['\x1b[31m42\x1b[0m', 1]]), None)
+
+    def test_headers_only(self):
+        for tablefmt in FORMATS:
+            if tablefmt == 'pipe':
+                # older tabulate writes || below the headers
+                expected = '| a   | b   |\n|-----|-----|'
+            else:
+                expected = tabulate.tabulate([['a', 'b']], tablefmt=tablefmt,
+                                             headers='firstrow')
+            eq_(self._write(tablefmt, [], headers=['a', 'b']), expected)
+
+    def test_rst_without_escaping(self):
+        # as tabulate before 0.8.0 does
+        escape = tables.RST_ESCAPE
+        tables.RST_ESCAPE = False
+        try:
+            output = self._write('rst', [['', 1], ['a', 2]])
+        finally:
+            tables.RST_ESCAPE = escape
+        eq_(output.split('\n')[1], '   1')
+
+    def test_rst_escaping(self):
+        escape = tables.RST_ESCAPE
+        tables.RST_ESCAPE = True
+        try:
+            output = self._write('rst', [['', 1], ['a', 2]])
+        finally:
+            tables.RST_ESCAPE = escape
+        eq_(output.split('\n')[1], '..  1')
+
+    def test_empty(self):
+        eq_(self._write('grid', []), '')
+
+    def test_sampled_widths_overflow(self):
+        rows = [['a', 1], ['b', 2], ['long', 300]]
+        expected = dedent("""
+        -  -
+        a  1
+        b  2
+        long  300
+        -  -""").strip('\n')
+        eq_(self._write('simple', rows, sample_rows=2), expected)
+        eq_(self._write('simple', rows, sample_rows=2, overflow=OVERFLOW),
+            expected)
+
+    def test_sampled_widths_truncate(self):
+        rows = [['ab', 1], ['cd', 2], ['long', 300], ['1234', 4]]
+        expected = dedent("""
+        --  -
+        ab  1
+        cd  2
+        l~  300
+        1234  4
+        --  -""").strip('\n')
+        eq_(self._write('simple', rows, sample_rows=2, overflow=TRUNCATE),
+            expected)
+
+    def test_truncate_leaves_numbers_whole(self):
+        rows = [[1, 'a'], [2, 'b'], [123456, 'longer text'], [-7.5, 'c']]
+        output = self._write('simple', rows, sample_rows=2,
+                             overflow=TRUNCATE)
+        lines = output.split('\n')
+        eq_(lines[3].split(), ['123456', '~'])
+        eq_(lines[4].split(), ['-7.5', 'c'])
+
+    def test_truncate_keeps_extra_cells(self):
+        rows = [['a'], ['b'], ['c', 'd']]
+        output = self._write('plain', rows, sample_rows=2,
+                             overflow=TRUNCATE)
+        eq_(output.split('\n')[2], 'c  d')
+
+    def test_sampled_rows_all_in_sample(self):
+        expected = tabulate.tabulate(self.rows, tablefmt='grid')
+        eq_(self._write('grid', iter(self.rows), sample_rows=10), expected)
+
+    @raises(Exception)
+    def test_unsupported_format(self):
+        TableWriter('html')
+
+    def _write(self, tablefmt, rows, headers=None, sample_rows=None,
+               overflow=OVERFLOW):
+        stream = StringIO()
+        writer = TableWriter(tablefmt, sample_rows=sample_rows,
+                             overflow=overflow)
+        writer.write(stream, rows, headers=headers)
+        return stream.getvalue()
+
+
+def test_sheet_with_wide_characters():
+    content = [[u'\u4e2d\u6587', 1], ['a', 22]]
+    sheet = pe.Sheet(content)
+    eq_(sheet.get_simple(write_title=False),
+        tabulate.tabulate(content, tablefmt='simple'))
+
+
+def test_tabulate_without_preserve_whitespace():
+    # tabulate before 0.8.1 has no PRESERVE_WHITESPACE
+    sheet = pe.Sheet([[1, 'a']])
+    expected = sheet.get_simple()
+    preserve = tabulate.__dict__.pop('PRESERVE_WHITESPACE', None)
+    try:
+        eq_(sheet.get_simple(), expected)
+    finally:
+        if preserve is not None:
+            tabulate.PRESERVE_WHITESPACE = preserve
+
+
+def test_streaming_sheet():
+    sheet = pe.Sheet([['a', 'b'], [1, 2.5], [3, 'x']], name='test',
+                     name_columns_by_row=0)
+    for tablefmt in FORMATS:
+        expected = getattr(sheet, 'get_%s' % tablefmt)()
+        stream = sheet.save_to_memory(tablefmt, streaming=True)
+        eq_(stream.getvalue(), expected)
+
+
+def test_streaming_sheet_stream():
+    rows = ([index, index * 1.5] for index in range(3))
+    stream = pe.isave_as(array=rows, dest_file_type='pipe',
+                         dest_streaming=True, dest_sample_rows=2)
+    expected = dedent("""
+    pyexcel_sheet1:
+    |--:|----:|
+    | 0 | 0   |
+    | 1 | 1.5 |
+    | 2 | 3   |""").strip('\n')
+    eq_(stream.getvalue(), expected)
+
+
+def test_streaming_sheet_stream_same_as_sheet_stream():
+    rows = [[1, None, 'a'], [2.5], [None, 'b']]
+    for tablefmt in FORMATS:
+        expected = pe.isave_as(array=iter(rows), dest_file_type=tablefmt)
+        stream = pe.isave_as(array=iter(rows), dest_file_type=tablefmt,
+                             dest_streaming=True)
+        eq_(stream.getvalue(), expected.getvalue())
+    stream = pe.isave_as(array=iter(rows), dest_file_type='html',
+                         dest_streaming=True)
+    eq_(stream.getvalue().count('<td></td>'), 5)
+
+
+def test_streaming_sheet_stream_with_new_lines():
+    rows = [['a\nb', 1], ['c', 22]]
+    for tablefmt in FORMATS:
+        expected = pe.isave_as(array=iter(rows), dest_file_type=tablefmt)
+        stream = pe.isave_as(array=iter(rows), dest_file_type=tablefmt,
+                             dest_streaming=True)
+        eq_(stream.getvalue(), expected.getvalue())
+
+
+def test_streaming_new_lines_after_the_sample():
+    # a known limitation, the sampled layout is kept
+    rows = [['a', 1], ['b\nc', 22]]
+    stream = pe.isave_as(array=iter(rows), dest_file_type='plain',
+                         dest_streaming=True, dest_sample_rows=1)
+    eq_(stream.getvalue(), 'pyexcel_sheet1:\na  1\nb\nc  22')
+
+
+class TestHtmlWriter:
+    def test_rows(self):
+        expected = dedent("""
+        <table>
+        <tbody>
+        <tr><td>a</td><td style="text-align: right;">1.5</td></tr>
+        <tr><td>&lt;b&gt;</td><td></td></tr>
+        </tbody>
+        </table>""").strip('\n')
+        eq_(self._write([['a', 1.5], ['<b>', None]]), expected)
+
+    def test_headers(self):
+        expected = dedent("""
+        <table>
+        <thead>
+        <tr><th>h</th><th>n</th></tr>
+        </thead>
+        <tbody>
+        <tr><td>a</td><td style="text-align: right;">22</td></tr>
+        </tbody>
+        </table>""").strip('\n')
+        eq_(self._write([['a', 22]], headers=['h', 'n']), expected)
+
+    def test_max_rows(self):
+        rows = ([index, 'x'] for index in range(1000))
+        expected = dedent("""
+        <table>
+        <tbody>
+        <tr><td style="text-align: right;">0</td><td>x</td></tr>
+        <tr><td style="text-align: right;">1</td><td>x</td></tr>
+        </tbody>
+        <tfoot>
+        <tr><td colspan="2">truncated</td></tr>
+        </tfoot>
+        </table>""").strip('\n')
+        eq_(self._write(rows, max_rows=2, chunk_rows=1), expected)
+
+    def test_max_rows_not_reached(self):
+        output = self._write([[1], [2]], max_rows=2)
+        assert 'truncated' not in output
+
+    def test_chunks(self):
+        stream = StringIO()
+        writes = []
+        stream.write = writes.append
+        HtmlWriter(chunk_rows=2).write(stream, [[1], [2], [3]])
+        eq_(len(writes), 5)
+
+    def _write(self, rows, headers=None, **keywords):
+        stream = StringIO()
+        HtmlWriter(**keywords).write(stream, rows, headers=headers)
+        return stream.getvalue()
+
+
+def test_streaming_html():
+    sheet = pe.Sheet([['a', 'b'], [1, 2], [3, 4]], name='test',
+                     name_columns_by_row=0)
+    stream = sheet.save_to_memory('html', streaming=True, max_rows=1)
+    expected = dedent("""
+    test:
+    <table>
+    <thead>
+    <tr><th>a</th><th>b</th></tr>
+    </thead>
+    <tbody>
+    <tr><td style="text-align: right;">1</td>\
+<td style="text-align: right;">2</td></tr>
+    </tbody>
+    <tfoot>
+    <tr><td colspan="2">truncated</td></tr>
+    </tfoot>
+    </table>""").strip('\n')
+    eq_(stream.getvalue(), expected)
+
+
+class TestRenderBook:
+    def setUp(self):
+        self.book = pe.get_book(bookdict={
+            'sheet %d' % index: [[index, 'a'], [1.5, None]]
+            for index in range(5)
+        })
+
+    def test_processes(self):
+        eq_(self.book.save_to_memory('grid', workers=2).getvalue(),
+            self.book.get_grid())
+
+    def test_threads(self):
+        eq_(self.book.save_to_memory('rst', workers=2,
+                                     threads=True).getvalue(),
+            self.book.get_rst())
+
+    def test_streaming(self):
+        expected = self.book.get_simple(write_title=False)
+        stream = self.book.save_to_memory('simple', workers=2,
+                                          streaming=True, write_title=False)
+        eq_(stream.getvalue(), expected)
+
+    def test_book_stream(self):
+        expected = self.book.get_plain()
+        stream = pe.isave_book_as(bookdict=self.book.to_dict(),
+                                  dest_file_type='plain', dest_workers=2)
+        eq_(stream.getvalue(), expected)
+
+
+class TestLayoutCache:
+    def setUp(self):
+        self.cache = LayoutCache(max_sheets=2)
+        self.sheet = pe.Sheet([['a', 'b'], [1, 2.5], [3, 'x']],
+                              name='test', name_columns_by_row=0)
+
+    def test_formats_share_the_layout(self):
+        for tablefmt in ['grid', 'simple', 'pipe']:
+            expected = getattr(self.sheet, 'get_%s' % tablefmt)()
+            eq_(self._render(self.sheet, tablefmt), expected)
+        eq_(self.cache.misses, 1)
+        eq_(self.cache.hits, 2)
+
+    def test_rst_has_its_own_layout(self):
+        self._render(self.sheet, 'grid')
+        eq_(self._render(self.sheet, 'rst'), self.sheet.get_rst())
+        eq_(self.cache.misses, 2)
+
+    def test_new_row(self):
+        self._render(self.sheet, 'grid')
+        self.sheet.row += [5, 'longer text']
+        eq_(self._render(self.sheet, 'grid'), self.sheet.get_grid())
+
+    def test_edited_cell(self):
+        self._render(self.sheet, 'grid')
+        self.sheet[1, 1] = 'changed'
+        eq_(self._render(self.sheet, 'grid'), self.sheet.get_grid())
+        eq_(self.cache.hits, 0)
+        self._render(self.sheet, 'grid')
+        eq_(self.cache.hits, 1)
+
+    def test_cell_of_another_type(self):
+        self._render(self.sheet, 'grid')
+        self.sheet[1, 0] = True
+        eq_(self._render(self.sheet, 'grid'), self.sheet.get_grid())
+        eq_(self.cache.hits, 0)
+
+    def test_unhashable_cell(self):
+        self.sheet[1, 1] = [1]
+        self._render(self.sheet, 'grid')
+        eq_(self._render(self.sheet, 'grid'), self.sheet.get_grid())
+        eq_(self.cache.hits, 0)
+
+    def test_invalidate(self):
+        self._render(self.sheet, 'grid')
+        self.sheet[1, 1] = 'changed'
+        self.cache.invalidate(self.sheet)
+        eq_(self._render(self.sheet, 'grid'), self.sheet.get_grid())
+        eq_(self.cache.hits, 0)
+
+    def test_least_recently_used_goes(self):
+        sheets = [pe.Sheet([[index]]) for index in range(3)]
+        for sheet in sheets:
+            self._render(sheet, 'plain')
+        self._render(sheets[0], 'plain')
+        eq_(self.cache.hits, 0)
+        self._render(sheets[2], 'plain')
+        eq_(self.cache.hits, 1)
+
+    def _render(self, sheet, tablefmt):
+        return sheet.save_to_memory(tablefmt, cache=self.cache).getvalue()